@@ -0,0 +1,57 @@
+# 19:00 の投稿のベンチマーク
+# 偽 Notion サーバーに遅延（と 429）を入れて、翌日分の投稿にかかる時間を並列数ごとに測る
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+from chimes import Config, load_timetable
+from chimes.notion_pages import NotionPoster
+from fake_notion import start_fake_notion
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CSV_FILE = os.path.join(HERE, "waseda_schedule_2025_spring.csv")
+
+def main():
+    parser = argparse.ArgumentParser(description="Notion 投稿（翌日の時間割）のベンチマーク")
+    parser.add_argument("--day", default="2025-04-08", help="投稿する日（既定は6コマある火曜日）")
+    parser.add_argument("--latency", type=float, default=0.3, help="1リクエストあたりの遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 を返す割合（0〜1）")
+    parser.add_argument("--workers", default="1,2,4", help="試す並列数（カンマ区切り）")
+    args = parser.parse_args()
+
+    server = start_fake_notion(args.latency, args.error_rate, retry_after=1)
+    day = date.fromisoformat(args.day)
+    print(f"📅 {day}（遅延 {args.latency * 1000:.0f} ms / 429 率 {args.error_rate:.0%}）")
+
+    def push(label, workers, ledger_path=None):
+        config = Config(
+            csv_path=CSV_FILE, log_file=os.devnull, post_workers=workers, ledger_path=ledger_path,
+            notion_token="bench", database_id="bench-database", parent_page_id="bench-parent",
+            notion_base_url=f"http://127.0.0.1:{server.server_port}",
+        )
+        poster = NotionPoster(config, lambda msg: None)
+        before = dict(server.stats)
+        started = time.perf_counter()
+        poster.push(load_timetable(config), day)
+        elapsed = time.perf_counter() - started
+        created = server.stats["created"] - before["created"]
+        requests = server.stats["requests"] - before["requests"]
+        print(f"{label}: {elapsed:.2f} 秒（作成 {created} 件 / リクエスト {requests} 件）")
+
+    # 記録（ledger）なしで、毎回すべて作成する時間
+    workers_list = [int(workers) for workers in args.workers.split(",")]
+    for workers in workers_list:
+        push(f"workers={workers}", workers)
+
+    # 記録ありで2回投稿すると、2回目（再起動後の再投稿）は何も送らない
+    with tempfile.TemporaryDirectory() as folder:
+        ledger_path = os.path.join(folder, "ledger.sqlite3")
+        push("記録あり・1回目", workers_list[-1], ledger_path)
+        push("記録あり・2回目", workers_list[-1], ledger_path)
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
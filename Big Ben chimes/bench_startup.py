@@ -0,0 +1,87 @@
+# 起動時間のベンチマーク
+# python -X importtime で各モジュールの読み込み時間を測り、別プロセスでピークメモリ（最大RSS）も測る
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CSV_FILE = os.path.join(HERE, "waseda_schedule_2025_spring.csv")
+
+# 測る対象（名前, 実行するコード）
+TARGETS = [
+    ("起動経路（chimes＋時間割）",
+     f"import chimes; from chimes.timetable import Timetable; Timetable({CSV_FILE!r})"),
+    ("bigben_lib", "import bigben_lib"),
+    ("音声（pygame）", "import pygame"),
+    ("Notion（投稿時のみ）", "import chimes.http_session"),
+    ("pandas（従来の起動経路）", "import pandas"),
+]
+
+# 最大RSSを出力する後処理（resource は Unix のみ。ru_maxrss は Linux では KB、macOS ではバイト）
+PEAK_RSS = (
+    "\ntry:\n"
+    "    import resource, sys\n"
+    "    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "    print(rss // 1024 if sys.platform == 'darwin' else rss)\n"
+    "except ImportError:\n"
+    "    print(-1)\n"
+)
+
+def run(code, importtime):
+    env = dict(os.environ, CSV_PATH=CSV_FILE, PYTHONDONTWRITEBYTECODE="1")
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code + PEAK_RSS]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=HERE, env=env, capture_output=True, text=True)
+    return result, time.perf_counter() - started
+
+def import_micros(stderr, skip=()):
+    """-X importtime の出力から、直接読み込んだモジュールの累積時間（μs）を合計する（skip は除く）"""
+    total = 0
+    slowest = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 字下げのない行が -c のコードから直接読み込んだモジュール
+        if not name[1:].startswith(" ") and name.strip() not in skip:
+            total += int(cumulative)
+            slowest.append((int(cumulative), name.strip()))
+    return total, sorted(slowest, reverse=True)[:3]
+
+def main():
+    parser = argparse.ArgumentParser(description="Big Ben の起動時間とピークメモリのベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5, help="各対象を測る回数（中央値を表示）")
+    args = parser.parse_args()
+
+    # インタープリター自体の起動時や計測用に読み込まれるモジュール（site, resource など）は除く
+    baseline, _ = run("pass", importtime=True)
+    interpreter = {
+        line.split("|")[-1].strip() for line in baseline.stderr.splitlines() if line.startswith("import time:")
+    }
+    print(f"🐍 {sys.executable}（Python 単体の最大RSS {baseline.stdout.strip()} KB）")
+
+    for name, code in TARGETS:
+        walls, imports, rss = [], [], 0
+        for _ in range(args.repeat):
+            result, wall = run(code, importtime=False)
+            if result.returncode != 0:
+                break
+            walls.append(wall)
+            rss = max(rss, int(result.stdout.split()[-1]))
+            traced, _ = run(code, importtime=True)
+            micros, slowest = import_micros(traced.stderr, interpreter)
+            imports.append(micros)
+        if not walls:
+            print(f"{name}: 実行できませんでした（{result.stderr.strip().splitlines()[-1]}）")
+            continue
+
+        walls.sort()
+        imports.sort()
+        detail = ", ".join(f"{module} {micros / 1000:.0f} ms" for micros, module in slowest)
+        print(f"{name}: 起動 {walls[len(walls) // 2] * 1000:6.0f} ms / import {imports[len(imports) // 2] / 1000:6.0f} ms"
+              f" / 最大RSS {rss / 1024 if rss >= 0 else float('nan'):5.1f} MB（{detail}）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+# Big Ben のチャイム＋Notionスケジューラー
+# bigben*.py は Config で違うところだけを指定して run() を呼ぶ入口
+from .config import EMPTY_SLOT, TIME_TABLE, Config
+from .runner import App, load_timetable, make_logger, run
@@ -0,0 +1,95 @@
+import itertools
+import os
+
+# チャイムの再生サービス
+# ・ミキサーの初期化と音声のデコードは起動時の1回だけ（鳴らすたびにファイルを読み直さない）
+# ・再生は pygame のチャンネル上で非同期に行い、呼び出し側（スケジューラー）は待たせない
+# ・イベントの種類（start / end / break）ごとに複数の音を登録でき、鳴らすたびに順番に切り替える
+
+EVENT_KINDS = ["start", "end", "break"]
+
+class NullBackend:
+    """音を出さずに再生要求だけを記録する（テストや音声デバイスのない環境用）"""
+
+    def __init__(self):
+        self.played = []
+
+    def load(self, path):
+        return path
+
+    def play(self, sound):
+        self.played.append(sound)
+
+
+class PygameBackend:
+    def __init__(self):
+        import pygame  # 音を鳴らす時だけ必要なので、ここで読み込む
+        self.pygame = pygame
+        pygame.mixer.init()
+
+    def load(self, path):
+        try:
+            # デコード済みの波形をメモリに持っておく
+            return self.pygame.mixer.Sound(path)
+        except self.pygame.error:
+            # Sound で読めない形式は、鳴らす時に music でストリーム再生する
+            return path
+
+    def play(self, sound):
+        if isinstance(sound, str):
+            self.pygame.mixer.music.load(sound)
+            self.pygame.mixer.music.play()
+        else:
+            # 空いているチャンネルで鳴らしてすぐに戻る
+            sound.play()
+
+
+def make_backend(name="pygame"):
+    if name == "null":
+        return NullBackend()
+    try:
+        return PygameBackend()
+    except Exception as e:
+        print(f"⚠️ 音声を初期化できないため、チャイムは鳴らさずに記録だけします: {e}")
+        return NullBackend()
+
+
+class AudioService:
+    def __init__(self, sounds, backend=None):
+        """sounds: {"start": [ファイル, ...], "end": [...], "break": [...]}"""
+        self.backend = backend or make_backend()
+        self.buffers = {}
+        for kind, paths in sounds.items():
+            loaded = []
+            for path in paths:
+                try:
+                    loaded.append(self.backend.load(path))
+                except Exception as e:
+                    print(f"⚠️ チャイム音を読み込めませんでした（{path}）: {e}")
+            if loaded:
+                self.buffers[kind] = itertools.cycle(loaded)
+
+    @classmethod
+    def from_env(cls, default_file, backend=None):
+        """
+        BELL_START_FILE / BELL_END_FILE / BELL_BREAK_FILE（複数なら os.pathsep 区切り）から音を読み込む。
+        指定がない種類は default_file を使う。BELL_AUDIO_BACKEND=null で音を出さない。
+        """
+        if backend is None:
+            backend = make_backend(os.getenv("BELL_AUDIO_BACKEND", "pygame"))
+        sounds = {
+            kind: os.getenv(f"BELL_{kind.upper()}_FILE", default_file).split(os.pathsep)
+            for kind in EVENT_KINDS
+        }
+        return cls(sounds, backend)
+
+    def play(self, kind="start"):
+        """kind の音を非同期に鳴らす。登録のない種類は start の音を使う"""
+        buffers = self.buffers.get(kind) or self.buffers.get("start")
+        if buffers is None:
+            return
+        try:
+            self.backend.play(next(buffers))
+        except Exception as e:
+            # 再生に失敗してもスケジューラーは止めない
+            print(f"⚠️ チャイムを再生できませんでした: {e}")
@@ -0,0 +1,86 @@
+import os
+
+from dotenv import load_dotenv
+
+from .timetable import WEEKDAYS_JP
+
+# 早稲田 2025前期のコマ開始時刻（chime_source="fixed" のときに毎日鳴らす）
+TIME_TABLE = {
+    "1限": "08:50",
+    "2限": "10:40",
+    "3限": "13:10",
+    "4限": "15:05",
+    "5限": "17:00",
+    "6限": "18:55"
+}
+
+# 科目が空欄のコマに入れる名前（bigben1〜3 で使っていたもの）
+EMPTY_SLOT = "🈳 空き（予定を入力）"
+
+
+class Config:
+    """
+    スケジューラーの設定。既定値は bigben.py の動作で、各スクリプトは違うところだけ指定する。
+
+    layout           コマの区切り方（"split" = 45+10+45 / "block" = 100分 / "50+10+40" など）
+    rules            曜日ごとの上書き。{"土": {"layout": "block", "chime": False, "post": False}}
+                     chime はその曜日にチャイムを鳴らすか、post はその曜日の予定を投稿するか
+    chime_source     "fixed"（TIME_TABLE の時刻に毎日）/ "timetable"（CSV にあるコマだけ）
+    chime_kinds      timetable のときに鳴らすチャイム（start / break / resume / end）
+    post_time        翌日の予定を投稿する時刻（None なら投稿しない）
+    title_property   カレンダーのタイトルプロパティ名。どのスクリプトも "Name" を使い、
+                     違う名前のデータベースに投稿するときだけ環境変数 NOTION_TITLE_PROPERTY で変える
+    tag_property     授業／空きのタグを付けるマルチセレクト（None なら付けない）
+    empty_title      科目が空欄のときのタイトル
+    child_page       親ページの下に YY-MMDD の子ページを作るか
+    child_title_property  子ページのタイトルのキー（"title" なら Notion の既定の形式で送る）
+    log_file         ログの出力先（None なら画面に表示）
+    post_workers     投稿を並列に送る数（http_session の PER_HOST_LIMIT 以下）
+    post_rate, post_burst  投稿の送信レート（回/秒）と一度に送れる数
+    ledger_path      投稿済みページの記録（SQLite）。None なら記録せず毎回すべて作成する
+    """
+
+    def __init__(self, **overrides):
+        load_dotenv()
+        self.notion_token = os.getenv("NOTION_TOKEN")
+        self.database_id = os.getenv("DATABASE_ID")
+        self.parent_page_id = os.getenv("PARENT_PAGE_ID")
+        self.notion_base_url = os.getenv("NOTION_BASE_URL")
+        self.csv_path = os.getenv("CSV_PATH")
+        self.bell_file = os.getenv("BELL_SOUND_FILE", "school_bell.mp3")
+
+        self.layout = "split"
+        self.rules = {}
+        self.chime_source = "fixed"
+        self.chime_times = list(TIME_TABLE.values())
+        self.chime_kinds = ("start",)
+        self.post_time = "19:00"
+        self.date_property = "日付"
+        self.tag_property = None
+        self.empty_title = ""
+        self.child_page = True
+        self.child_title_property = "Name"
+        self.log_file = "bigben_log.txt"
+        self.post_workers = 4
+        self.post_rate = 3.0
+        self.post_burst = 10
+        self.ledger_path = "bigben_ledger.sqlite3"
+
+        for key, value in overrides.items():
+            if not hasattr(self, key):
+                raise TypeError(f"unknown setting: {key}")
+            setattr(self, key, value)
+
+        # タイトルのプロパティ名はスクリプトごとに変えない（"名前" などは存在せず投稿に失敗していた）
+        self.title_property = os.getenv("NOTION_TITLE_PROPERTY", "Name")
+
+    def rule(self, weekday, key, default=None):
+        """曜日（0 = 月曜）の設定。rules になければ default"""
+        return self.rules.get(WEEKDAYS_JP[weekday], {}).get(key, default)
+
+    def weekday_layouts(self):
+        return {
+            weekday: self.rules[name]["layout"]
+            for weekday, name in enumerate(WEEKDAYS_JP)
+            if "layout" in self.rules.get(name, {})
+        }
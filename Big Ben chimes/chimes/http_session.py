@@ -0,0 +1,49 @@
+import random
+import time
+
+import httpx
+from notion_client import Client
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+# Notion の HTTP まわり（投稿する時に初めて読み込む）
+# ・keep-alive の接続プールを使い回す
+# ・同時接続数を制限する
+# ・429 / 5xx は Retry-After に従い、なければ指数バックオフで再試行する
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+PER_HOST_LIMIT = 4
+
+def build_notion_client(auth, base_url=None, per_host=PER_HOST_LIMIT):
+    """接続プールの上限を決めた httpx クライアントで Notion クライアントを作る"""
+    http_client = httpx.Client(limits=httpx.Limits(max_connections=per_host, max_keepalive_connections=per_host))
+    options = {"auth": auth, "client": http_client}
+    if base_url:
+        options["base_url"] = base_url
+    return Client(**options)
+
+def retry_delay(attempt, retry_after=None):
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    # 指数バックオフ（同時に再試行しないよう少しずらす）
+    return min(BACKOFF_SECONDS * (2 ** attempt), MAX_BACKOFF_SECONDS) * random.uniform(0.5, 1.0)
+
+def notion_call(func, *args, retries=MAX_RETRIES, **kwargs):
+    """Notion API 呼び出しを 429 / 5xx / タイムアウト時に再試行する"""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except HTTPResponseError as e:
+            if e.status not in RETRY_STATUSES or attempt == retries:
+                raise
+            delay = retry_delay(attempt, e.headers.get("retry-after"))
+        except (RequestTimeoutError, httpx.TransportError):
+            if attempt == retries:
+                raise
+            delay = retry_delay(attempt)
+        time.sleep(delay)
@@ -0,0 +1,35 @@
+from collections import namedtuple
+
+# コマの区切り方（レイアウト）
+# レイアウトは (開始, 終了)（0:00 からの分）を受け取り、Segment のタプルを返す関数
+# ・label が "break" の区間は休憩。それ以外（A, B, … / block）がカレンダーに載せる区間
+
+Segment = namedtuple("Segment", "label start end")
+
+def block(start, end):
+    """100分のコマをそのまま1区間にする"""
+    return (Segment("block", start, end),)
+
+def custom(*minutes):
+    """区間の長さ（分）を「授業, 休憩, 授業, …」の順に並べたレイアウトを作る"""
+    def layout(start, end):
+        segments = []
+        for i, length in enumerate(minutes):
+            label = "ABCDEFGHIJ"[i // 2] if i % 2 == 0 else "break"
+            segments.append(Segment(label, start, start + length))
+            start += length
+        return tuple(segments)
+    return layout
+
+# 45分＋休憩10分＋45分
+split = custom(45, 10, 45)
+
+LAYOUTS = {"block": block, "split": split}
+
+def get_layout(spec):
+    """"block" / "split" / "50+10+40" のような指定からレイアウトを返す（関数ならそのまま）"""
+    if callable(spec):
+        return spec
+    if spec in LAYOUTS:
+        return LAYOUTS[spec]
+    return custom(*(int(length) for length in spec.split("+")))
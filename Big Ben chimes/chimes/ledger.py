@@ -0,0 +1,53 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+
+# Notion に投稿済みのページの記録（日付・時限・区間ごとに page_id と内容のハッシュ）
+# 再起動して同じ日をもう一度投稿しても、新しい分だけ作成し、変わった分だけ更新する
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posted (
+    date TEXT NOT NULL,
+    period TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    page_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    posted_at TEXT NOT NULL,
+    PRIMARY KEY (date, period, segment)
+)
+"""
+
+def content_hash(kwargs):
+    """pages.create に渡す引数のハッシュ（キーの順序には左右されない）"""
+    return hashlib.sha1(json.dumps(kwargs, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SyncLedger:
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(SCHEMA)
+
+    def entries(self, date):
+        """その日の記録。{(date, period, segment): (page_id, hash)}"""
+        return {
+            (date, period, segment): (page_id, hash)
+            for period, segment, page_id, hash in self.conn.execute(
+                "SELECT period, segment, page_id, hash FROM posted WHERE date = ?", (date,)
+            )
+        }
+
+    def store(self, key, page_id, hash):
+        # 1件ごとに確定させる（途中で止まっても送った分は記録に残る）
+        self.conn.execute(
+            "INSERT OR REPLACE INTO posted (date, period, segment, page_id, hash, posted_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, page_id, hash, datetime.now().isoformat(timespec="seconds"))
+        )
+        self.conn.commit()
+
+    def remove(self, key):
+        self.conn.execute("DELETE FROM posted WHERE date = ? AND period = ? AND segment = ?", key)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
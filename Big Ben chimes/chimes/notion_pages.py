@@ -0,0 +1,206 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .ledger import SyncLedger, content_hash
+from .rate_limit import TokenBucket
+from .timetable import WEEKDAYS_JP, hhmm, on_date
+
+# 翌日の時間割を Notion に載せる
+# ・カレンダー（データベース）にはレイアウトの区間（休憩以外）ごとに1ページ
+# ・親ページの下には YY-MMDD の子ページを作り、区間と休憩を1行ずつ書く
+# ・送るページは先に全部組み立て、同時実行数と送信レートを制限しながら並列に送る
+# ・投稿済みの記録（ledger）と比べ、新しい分だけ作成し、内容が変わった分だけ更新する
+
+def segment_name(segment):
+    return "コマ" if segment.label == "block" else f"セグメント{segment.label}"
+
+def paragraph(text):
+    return {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]}
+    }
+
+def calendar_pages(config, timetable, day):
+    """day の予定のページ一覧。[{"period", "segment", "name", "span", "title", "kwargs"(pages.create の引数)}, ...]"""
+    pages = []
+    for period in timetable.periods_on(day.weekday()):
+        title = period.subject or config.empty_title
+        for segment in period.segments:
+            if segment.label == "break":
+                continue
+            properties = {
+                config.title_property: {"title": [{"text": {"content": title}}]},
+                config.date_property: {"date": {
+                    "start": on_date(day, segment.start).isoformat(),
+                    "end": on_date(day, segment.end).isoformat(),
+                }},
+            }
+            if config.tag_property:
+                properties[config.tag_property] = {"multi_select": [{"name": "授業" if period.subject else "空き"}]}
+            pages.append({
+                "period": period.period,
+                "segment": segment.label,
+                "name": segment_name(segment),
+                "span": f"{hhmm(segment.start)}～{hhmm(segment.end)}",
+                "title": title,
+                "kwargs": {"parent": {"database_id": config.database_id}, "properties": properties},
+            })
+    return pages
+
+def child_page(config, timetable, day):
+    """子ページのタイトルと pages.create の引数"""
+    weekday_jp = WEEKDAYS_JP[day.weekday()]
+    title = day.strftime("%y-%m%d")
+
+    blocks = [
+        {
+            "object": "block",
+            "type": "heading_2",
+            "heading_2": {
+                "rich_text": [{"type": "text", "text": {"content": f"{day:%Y-%m-%d}（{weekday_jp}）の時間割"}}]
+            }
+        }
+    ]
+    for period in timetable.periods_on(day.weekday()):
+        subject = period.subject or config.empty_title
+        for segment in period.segments:
+            text = "【休憩】" if segment.label == "break" else subject
+            blocks.append(paragraph(f"{hhmm(segment.start)}～{hhmm(segment.end)}　{text}"))
+
+    title_value = [{"text": {"content": title}}]
+    if config.child_title_property == "title":
+        properties = {"title": title_value}
+    else:
+        properties = {config.child_title_property: {"title": title_value}}
+    return title, {"parent": {"page_id": config.parent_page_id}, "properties": properties, "children": blocks}
+
+
+class NotionPoster:
+    def __init__(self, config, log):
+        self.config = config
+        self.log = log
+        self.notion = None
+        self.ledger = None
+        self.bucket = TokenBucket(config.post_rate, config.post_burst)
+
+    def client(self):
+        # notion_client / httpx は投稿する時に初めて読み込む
+        if self.notion is None:
+            from .http_session import build_notion_client
+            self.notion = build_notion_client(self.config.notion_token, self.config.notion_base_url)
+        return self.notion
+
+    def posted(self, date):
+        """その日の投稿済みの記録（ledger_path が None なら記録しない）"""
+        if self.config.ledger_path is None:
+            return {}
+        if self.ledger is None:
+            self.ledger = SyncLedger(self.config.ledger_path)
+        return self.ledger.entries(date)
+
+    def limited(self, method, **kwargs):
+        # 再試行も含めて、1回送るごとにトークンを1つ使う
+        self.bucket.acquire()
+        return method(**kwargs)
+
+    def call(self, method, **kwargs):
+        """接続プールと 429 / 5xx の再試行つきで Notion API を呼ぶ"""
+        from .http_session import notion_call
+        return notion_call(self.limited, method, **kwargs)
+
+    def create(self, **kwargs):
+        return self.call(self.client().pages.create, **kwargs)
+
+    def apply(self, job, page_id):
+        """1件分を送り、記録する page_id を返す（新規なら作成、投稿済みなら更新）"""
+        pages = self.client().pages
+        if page_id is not None:
+            try:
+                if job["key"][2] != "child":
+                    self.call(pages.update, page_id=page_id, properties=job["kwargs"]["properties"])
+                    return page_id
+                # 子ページの本文は書き換えられないので、古いページをアーカイブして作り直す
+                self.call(pages.update, page_id=page_id, archived=True)
+            except Exception as e:
+                # Notion 側で消されていたら作り直す
+                if getattr(e, "status", None) != 404:
+                    raise
+        return self.create(**job["kwargs"])["id"]
+
+    def calendar_jobs(self, timetable, day):
+        jobs = []
+        for page in calendar_pages(self.config, timetable, day):
+            jobs.append({
+                "key": (f"{day:%Y-%m-%d}", page["period"], page["segment"]),
+                "kwargs": page["kwargs"],
+                "created": f"✅ {page['name']} 投稿: {page['span']} [{page['title']}]",
+                "updated": f"🔁 {page['name']} 更新: {page['span']} [{page['title']}]",
+                "failed": f"❌ {page['name']} 投稿エラー（{page['span']}）",
+            })
+        return jobs
+
+    def child_jobs(self, timetable, day):
+        title, kwargs = child_page(self.config, timetable, day)
+        return [{
+            "key": (f"{day:%Y-%m-%d}", "", "child"),
+            "kwargs": kwargs,
+            "created": f"📄 子ページ「{title}」を作成しました。",
+            "updated": f"📄 子ページ「{title}」を作り直しました。",
+            "failed": "❌ 子ページ作成エラー",
+        }]
+
+    def send(self, jobs, date, prune=False):
+        """
+        jobs を並列に送り、順番どおりにログを書く。投稿済みで内容が同じものは送らない。
+        prune=True なら、その日の記録にあって jobs にないページ（時間割から消えた予定）をアーカイブする。
+        """
+        posted = self.posted(date)
+        todo = []
+        unchanged = 0
+        for job in jobs:
+            job["hash"] = content_hash(job["kwargs"])
+            page_id, hash = posted.pop(job["key"], (None, None))
+            if hash == job["hash"]:
+                unchanged += 1
+            else:
+                todo.append((job, page_id))
+        stale = posted if prune else {}
+
+        if todo or stale:
+            pages = self.client().pages
+            with ThreadPoolExecutor(max_workers=self.config.post_workers) as pool:
+                futures = [pool.submit(self.apply, job, page_id) for job, page_id in todo]
+                archives = [
+                    (key, pool.submit(self.call, pages.update, page_id=page_id, archived=True))
+                    for key, (page_id, _) in stale.items()
+                ]
+                for (job, page_id), future in zip(todo, futures):
+                    try:
+                        new_page_id = future.result()
+                        if self.ledger is not None:
+                            self.ledger.store(job["key"], new_page_id, job["hash"])
+                        self.log(job["updated"] if page_id else job["created"])
+                    except Exception as e:
+                        self.log(f"{job['failed']}: {e}")
+                for key, future in archives:
+                    try:
+                        future.result()
+                        self.ledger.remove(key)
+                        self.log(f"🗑️ 時間割から消えた予定をアーカイブしました（{key[0]} {key[1]} {key[2]}）")
+                    except Exception as e:
+                        self.log(f"❌ アーカイブエラー（{key[0]} {key[1]} {key[2]}）: {e}")
+        if unchanged:
+            self.log(f"⏭️ 投稿済みで変更のない {unchanged} 件は送りませんでした")
+
+    def push(self, timetable, day):
+        """day の予定（設定によっては子ページも）をまとめて送る"""
+        jobs = self.calendar_jobs(timetable, day)
+        if self.config.child_page:
+            jobs += self.child_jobs(timetable, day)
+        self.send(jobs, f"{day:%Y-%m-%d}", prune=True)
+
+    def post_schedule(self, timetable, day):
+        self.send(self.calendar_jobs(timetable, day), f"{day:%Y-%m-%d}")
+
+    def create_child_page(self, timetable, day):
+        self.send(self.child_jobs(timetable, day), f"{day:%Y-%m-%d}")
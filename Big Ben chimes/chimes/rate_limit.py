@@ -0,0 +1,24 @@
+import threading
+import time
+
+# Notion への投稿のレート制限（トークンバケット。投稿スレッドから共有して使う）
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate            # 1秒あたりに補充されるトークン数
+        self.burst = burst          # 一度に送れる最大数
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンが1つ使えるようになるまで待つ"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
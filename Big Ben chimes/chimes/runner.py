@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+from .audio import AudioService
+from .config import Config
+from .notion_pages import NotionPoster
+from .scheduler import Scheduler
+from .timetable import WEEKDAYS_JP, Timetable
+
+# チャイムと翌日の予定の投稿を、1つのスケジューラーで動かす
+
+# timetable のチャイムを鳴らす時の表示
+CHIME_MESSAGES = {
+    "start": "の授業が開始されます",
+    "break": "の休憩です",
+    "resume": "の後半が始まります",
+    "end": "の授業が終了しました",
+}
+
+def make_logger(log_file):
+    """log_file があれば時刻つきで追記し、None なら画面に表示する"""
+    def log(msg):
+        if log_file is None:
+            print(msg)
+            return
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{now}] {msg}\n")
+    return log
+
+def load_timetable(config):
+    return Timetable(config.csv_path, config.layout, config.weekday_layouts())
+
+
+class App:
+    def __init__(self, config):
+        self.config = config
+        self.log = make_logger(config.log_file)
+        self.timetable = load_timetable(config)
+        self.poster = NotionPoster(config, self.log)
+        self.scheduler = Scheduler()
+        self.audio = None
+        self.next_chime_at = None
+
+    # ------------------------
+    # チャイム
+    # ------------------------
+    def chime_enabled(self, when):
+        return self.config.rule(when.weekday(), "chime", True)
+
+    def ring_fixed(self, period_time):
+        if not self.chime_enabled(datetime.now()):
+            return
+        self.log(f"🔔 チャイム鳴動：{period_time}")
+        self.audio.play("start")
+
+    def schedule_next_chime(self, after):
+        found = self.timetable.next_chime(after, self.config.chime_kinds)
+        if found is None:
+            return
+        when, chimes = found
+        self.next_chime_at = when
+        self.scheduler.at(when, lambda: self.ring_timetable(when, chimes), name=f"チャイム {when:%H:%M}")
+
+    def ring_timetable(self, when, chimes):
+        # CSV が更新されていれば、その時刻のチャイムを引き直す
+        if self.timetable.reload_if_changed():
+            minute = when.hour * 60 + when.minute
+            chimes = [
+                chime for chime in self.timetable.chimes_at(when.weekday(), minute)
+                if chime.kind in self.config.chime_kinds
+            ]
+        self.schedule_next_chime(when)
+        if not chimes or not self.chime_enabled(when):
+            return
+        chime = chimes[0]
+        subject = chime.period.subject or self.config.empty_title
+        self.log(f"🔔 {WEEKDAYS_JP[when.weekday()]} {when:%H:%M} - {subject} {CHIME_MESSAGES[chime.kind]}")
+        self.audio.play(chime.kind)
+
+    # ------------------------
+    # Notion 投稿（翌日の予定）
+    # ------------------------
+    def post(self):
+        day = datetime.now() + timedelta(days=1)
+        if not self.config.rule(day.weekday(), "post", True):
+            return
+        self.log(f"🕖 {self.config.post_time} - Notion投稿開始")
+        try:
+            self.timetable.reload_if_changed()
+            self.poster.push(self.timetable, day)
+            if self.config.child_page:
+                self.log("✅ Notionへの投稿・子ページ作成完了")
+            else:
+                self.log("✅ Notionへの投稿完了")
+        except Exception as e:
+            self.log(f"❌ Notion投稿処理中のエラー: {e}")
+
+    # ------------------------
+    # メインループ
+    # ------------------------
+    def skipped(self, name, when):
+        self.log(f"⏭️ {when.strftime('%m/%d %H:%M')} の「{name}」は時刻を大きく過ぎたため実行しませんでした")
+        # 時間割のチャイムは1つずつ予約しているので、飛ばした時は次を予約し直す
+        if when == self.next_chime_at:
+            self.schedule_next_chime(self.scheduler.clock())
+
+    def run(self):
+        config = self.config
+        # ミキサーの初期化と音のデコードは起動時に1回だけ行い、再生は待たずに戻る
+        self.audio = AudioService.from_env(config.bell_file)
+
+        if config.chime_source == "fixed":
+            for period_time in config.chime_times:
+                # 鳴らし忘れ防止の猶予は1分（従来の「同じ分なら鳴らす」と同じ）
+                self.scheduler.daily(period_time, lambda t=period_time: self.ring_fixed(t),
+                                     name=f"チャイム {period_time}", grace=60)
+        else:
+            self.schedule_next_chime(datetime.now() - timedelta(minutes=1))
+
+        if config.post_time:
+            # 投稿は1時間以内なら遅れても実行する（従来の hour == 19 判定と同じ）
+            self.scheduler.daily(config.post_time, self.post, name="Notion投稿", grace=3600)
+            print("📚 チャイム＋Notionスケジューラーを起動しました（Ctrl+Cで停止）")
+        else:
+            print("📚 チャイム監視を開始します（Ctrl+Cで停止）")
+        if config.log_file:
+            self.log("スクリプト起動")
+
+        self.scheduler.run(on_skip=self.skipped)
+
+
+def run(config=None, **overrides):
+    App(config or Config(**overrides)).run()
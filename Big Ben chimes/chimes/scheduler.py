@@ -0,0 +1,68 @@
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+
+# 予定時刻のヒープを持ち、次の予定の時刻まで眠るだけのスケジューラー（10秒ごとのポーリングをやめる）
+# ・眠るのは time.sleep で、起きるたびに壁時計から残り時間を計算し直す
+#   （NTP の時刻合わせやスリープ復帰で壁時計がずれても、次に起きた時点で補正される）
+#   Windows の Event.wait は Ctrl+C で起きないので使わない（time.sleep ならすぐ止まる）
+# ・1回に眠るのは最大 MAX_SLEEP 秒までにして、壁時計のずれに1分以内で追従する
+MAX_SLEEP = 60.0
+
+# 毎日の予定の間隔
+DAY = timedelta(days=1)
+
+class Scheduler:
+    def __init__(self, clock=datetime.now):
+        self.clock = clock
+        self.queue = []
+        self.counter = itertools.count()
+
+    def at(self, when, callback, name="", grace=60, repeat=None):
+        """
+        when（datetime）に callback を実行する。
+        grace 秒より遅れた予定は実行せずに捨て、repeat（timedelta）があれば次の回を入れ直す。
+        """
+        heapq.heappush(self.queue, (when, next(self.counter), name, grace, repeat, callback))
+
+    def daily(self, hhmm, callback, name="", grace=60):
+        """毎日 hhmm（"08:50" など）に callback を実行する"""
+        now = self.clock()
+        hour, minute = map(int, hhmm.split(":"))
+        when = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        # 今日の時刻を過ぎていても grace 以内なら今日の分として扱う（起動直後の取りこぼし防止）
+        if (now - when).total_seconds() > grace:
+            when += DAY
+        self.at(when, callback, name, grace, DAY)
+
+    def next_event(self):
+        """次の予定の (時刻, 名前)。予定がなければ None"""
+        if not self.queue:
+            return None
+        when, _, name, _, _, _ = self.queue[0]
+        return when, name
+
+    def run(self, on_skip=None):
+        """予定がなくなるまで（Ctrl+C で止めるまで）、予定時刻ごとに callback を実行する"""
+        while self.queue:
+            when, _, name, grace, repeat, callback = self.queue[0]
+            remaining = (when - self.clock()).total_seconds()
+            if remaining > 0:
+                time.sleep(min(remaining, MAX_SLEEP))
+                continue
+
+            heapq.heappop(self.queue)
+            if repeat is not None:
+                # スリープ復帰などで何日分も遅れていても、次の回は未来の時刻にする
+                next_when = when + repeat
+                while (self.clock() - next_when).total_seconds() > grace:
+                    next_when += repeat
+                self.at(next_when, callback, name, grace, repeat)
+
+            if -remaining > grace:
+                # 大きく遅れた予定は実行しない（まとめてチャイムが鳴るのを防ぐ）
+                if on_skip:
+                    on_skip(name, when)
+                continue
+            callback()
@@ -0,0 +1,104 @@
+import bisect
+import csv
+import os
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from .layouts import get_layout
+
+# 時間割CSV（曜日,時限,開始時刻,終了時刻,科目,メモ）を1回だけ読み込み、
+# 曜日ごとのコマ一覧と「曜日 × 1日の中の分」で引けるチャイムの表を作っておく
+# ・チャイムの判定は辞書を1回引くだけ（pandas は使わない）
+# ・CSV は mtime が変わった時だけ読み直す
+
+WEEKDAYS_JP = ["月", "火", "水", "木", "金", "土", "日"]
+
+# 時刻はすべて 0:00 からの分で持つ（segments はレイアウトで区切った区間）
+Period = namedtuple("Period", "weekday period start end subject memo segments")
+Chime = namedtuple("Chime", "kind period")
+
+def minute_of_day(hhmm):
+    hour, minute = map(int, hhmm.strip().split(":"))
+    return hour * 60 + minute
+
+def hhmm(minute):
+    return f"{minute // 60:02}:{minute % 60:02}"
+
+def on_date(date, minute):
+    """date の minute 分の datetime"""
+    return datetime.combine(date, time(minute // 60, minute % 60))
+
+
+class Timetable:
+    def __init__(self, path, layout="split", weekday_layouts=None):
+        """weekday_layouts: {曜日（0 = 月曜）: レイアウト} で曜日ごとに区切り方を変えられる"""
+        self.path = path
+        self.layout = get_layout(layout)
+        self.weekday_layouts = {
+            weekday: get_layout(spec) for weekday, spec in (weekday_layouts or {}).items()
+        }
+        self.mtime_ns = None
+        self.load()
+
+    def load(self):
+        periods = [[] for _ in WEEKDAYS_JP]
+        with open(self.path, newline="", encoding="utf-8-sig") as f:
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            for row in csv.DictReader(f):
+                weekday = WEEKDAYS_JP.index(row["曜日"].strip())
+                start = minute_of_day(row["開始時刻"])
+                end = minute_of_day(row["終了時刻"])
+                layout = self.weekday_layouts.get(weekday, self.layout)
+                periods[weekday].append(Period(
+                    weekday, row["時限"].strip(), start, end,
+                    (row["科目"] or "").strip(), (row.get("メモ") or "").strip(),
+                    layout(start, end),
+                ))
+
+        # 曜日ごとに {分: [Chime, ...]}
+        # kind は start（コマ開始）/ break（休憩開始）/ resume（休憩明け）/ end（コマ終了）
+        slots = [{} for _ in WEEKDAYS_JP]
+        for weekday, day in enumerate(periods):
+            day.sort(key=lambda period: period.start)
+            for period in day:
+                boundaries = [(period.start, "start"), (period.end, "end")]
+                for segment in period.segments:
+                    if segment.label == "break":
+                        boundaries += [(segment.start, "break"), (segment.end, "resume")]
+                for minute, kind in sorted(boundaries):
+                    slots[weekday].setdefault(minute, []).append(Chime(kind, period))
+
+        self.periods = periods
+        self.slots = slots
+        self.minutes = [sorted(day) for day in slots]
+
+    def reload_if_changed(self):
+        """CSV が更新されていれば読み直す。読み直したら True"""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime_ns == self.mtime_ns:
+            return False
+        self.load()
+        return True
+
+    def periods_on(self, weekday):
+        """その曜日（0 = 月曜）のコマを開始時刻順に返す"""
+        return self.periods[weekday]
+
+    def chimes_at(self, weekday, minute):
+        """その曜日・その分に鳴らすチャイム（なければ空）"""
+        return self.slots[weekday].get(minute, ())
+
+    def next_chime(self, after, kinds=("start",)):
+        """after より後で最初に kinds のチャイムが鳴る (datetime, [Chime, ...])。1週間なければ None"""
+        for offset in range(8):
+            day = after.date() + timedelta(days=offset)
+            minutes = self.minutes[day.weekday()]
+            first = bisect.bisect_right(minutes, after.hour * 60 + after.minute) if offset == 0 else 0
+            for minute in minutes[first:]:
+                chimes = [chime for chime in self.slots[day.weekday()][minute] if chime.kind in kinds]
+                if chimes:
+                    return on_date(day, minute), chimes
+        return None
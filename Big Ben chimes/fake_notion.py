@@ -0,0 +1,101 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 投稿処理を試すためのローカルの偽 Notion サーバー
+# ページの作成（POST /v1/pages）・更新（PATCH /v1/pages/{id}）・取得（GET /v1/pages/{id}）をメモリ上で受け付ける
+# 応答の遅延と 429 の混入率を指定できる
+class FakeNotionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        server = self.server
+        with server.lock:
+            server.stats["requests"] += 1
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            with server.lock:
+                server.stats["429"] += 1
+            self.reply(429, {"object": "error", "status": 429, "code": "rate_limited", "message": "rate limited"},
+                       {"Retry-After": str(server.retry_after)})
+            return
+
+        path = self.path.split("?", 1)[0]
+        if self.command == "POST" and path == "/v1/pages":
+            page = {"object": "page", "id": str(uuid.uuid4()), **body}
+            with server.lock:
+                server.pages[page["id"]] = page
+                server.stats["created"] += 1
+            self.reply(200, page)
+            return
+
+        page_id = path[len("/v1/pages/"):] if path.startswith("/v1/pages/") else None
+        with server.lock:
+            page = server.pages.get(page_id)
+            if page is not None and self.command == "PATCH":
+                page["properties"].update(body.get("properties", {}))
+                if "archived" in body:
+                    page["archived"] = body["archived"]
+                server.stats["updated"] += 1
+        if page is None:
+            self.reply(404, {"object": "error", "status": 404, "code": "object_not_found", "message": self.path})
+        else:
+            self.reply(200, page)
+
+    do_GET = handle_request
+    do_POST = handle_request
+    do_PATCH = handle_request
+
+def start_fake_notion(latency=0.0, error_rate=0.0, retry_after=1, port=0):
+    """バックグラウンドで偽 Notion サーバーを起動し、サーバーを返す（server.pages に作成されたページ）"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeNotionHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.retry_after = retry_after
+    server.pages = {}
+    server.stats = {"requests": 0, "429": 0, "created": 0, "updated": 0}
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="投稿処理を試すための偽 Notion サーバー")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="1リクエストあたりの遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 を返す割合（0〜1）")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 に付ける Retry-After（秒）")
+    args = parser.parse_args()
+
+    server = start_fake_notion(args.latency, args.error_rate, args.retry_after, args.port)
+    print(f"🧪 偽 Notion サーバー起動: NOTION_BASE_URL=http://127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"📊 {server.stats}")
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
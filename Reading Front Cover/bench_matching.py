@@ -0,0 +1,81 @@
+# あいまい一致のベンチマーク
+# 従来の採点ループと、main.py が1冊ずつ呼ぶ matching.best_match を合成データで比べる
+import argparse
+import random
+import string
+import time
+
+from rapidfuzz import fuzz
+
+from matching import best_match, book_info
+
+def random_words(rng, count):
+    return " ".join(
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        for _ in range(count)
+    )
+
+def make_dataset(rng, books, candidates_per_book):
+    queries, candidates = [], []
+    for _ in range(books):
+        title = random_words(rng, rng.randint(2, 6))
+        author = random_words(rng, 2)
+        items = []
+        for number in range(candidates_per_book):
+            # 一部の候補は元の書名を少し崩したもの、残りは無関係な本
+            found_title = title if number == 0 else random_words(rng, rng.randint(2, 6))
+            if rng.random() < 0.3:
+                found_title = found_title.upper()
+            items.append({"volumeInfo": {
+                "title": found_title,
+                "authors": [author if number == 0 else random_words(rng, 2)],
+                "industryIdentifiers": [{"type": "ISBN_13", "identifier": str(rng.randrange(10**12, 10**13))}],
+            }})
+        rng.shuffle(items)
+        queries.append((title, author))
+        candidates.append(items)
+    return queries, candidates
+
+def legacy_best_match(title, author, items):
+    # main.py の search_google_books_fuzzy にあった採点ループ
+    best_score = 0
+    best_item = None
+    for item in items:
+        info = item.get("volumeInfo", {})
+        title_score = fuzz.token_sort_ratio(title, info.get("title", ""))
+        author_score = fuzz.token_sort_ratio(author, " ".join(info.get("authors", [])))
+        score = (title_score + author_score) / 2
+        if score > best_score:
+            best_item = item
+            best_score = score
+    return book_info(best_item, best_score) if best_item and best_score >= 60 else None
+
+def main():
+    parser = argparse.ArgumentParser(description="あいまい一致の採点方法のベンチマーク")
+    parser.add_argument("--books", type=int, default=3000, help="合成する書名・著者の組の数")
+    parser.add_argument("--candidates", type=int, default=10, help="1冊あたりの候補数（Google Books の maxResults）")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries, candidates = make_dataset(rng, args.books, args.candidates)
+    pairs = args.books * args.candidates
+
+    started = time.perf_counter()
+    legacy = [legacy_best_match(title, author, items) for (title, author), items in zip(queries, candidates)]
+    legacy_elapsed = time.perf_counter() - started
+
+    # main.py の search_google_books_fuzzy と同じく、1冊ごとに呼ぶ
+    started = time.perf_counter()
+    current = [best_match(title, author, items) for (title, author), items in zip(queries, candidates)]
+    current_elapsed = time.perf_counter() - started
+
+    same = all(
+        (a is None and b is None) or (a and b and a["isbn13"] == b["isbn13"] and abs(a["score"] - b["score"]) < 1e-3)
+        for a, b in zip(legacy, current)
+    )
+    print(f"従来のループ: {legacy_elapsed * 1000:8.1f} ms（{pairs / legacy_elapsed:,.0f} ペア/秒）")
+    print(f"best_match  : {current_elapsed * 1000:8.1f} ms（{pairs / current_elapsed:,.0f} ペア/秒）")
+    print(f"結果の一致: {'OK' if same else 'NG'}（マッチ {sum(1 for b in current if b)} / {args.books} 冊）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# 表紙同期のベンチマーク
+# 合成した fixtures をスタブサーバーで返し、main.py の同期を端から端まで動かして冊/秒を測る
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import urllib.parse
+
+from stub_server import start_stub_server
+
+DATABASE_ID = "bench-database"
+PAGE_SIZE = 100
+
+def make_fixtures(books):
+    fixtures = {}
+    pages = []
+    for i in range(books):
+        title = f"合成書籍 {i}"
+        author = f"著者 {i % 50}"
+        pages.append({
+            "object": "page",
+            "id": f"page-{i:05}",
+            "last_edited_time": "2025-01-01T00:00:00.000Z",
+            "properties": {
+                "タイトル": {"title": [{"text": {"content": title}}]},
+                "著者": {"rich_text": [{"text": {"content": author}}]},
+                "ISBN": {"rich_text": []},
+                "表紙（画像URL）": {"url": None},
+            },
+        })
+        query = urllib.parse.quote(f"{title} {author}")
+        fixtures[f"GET /books/v1/volumes?q={query}&maxResults=10"] = {"status": 200, "body": {"items": [
+            {"volumeInfo": {
+                "title": title if n == 0 else f"別の本 {i}-{n}",
+                "authors": [author],
+                "industryIdentifiers": [{"type": "ISBN_13", "identifier": f"978{i:010}"}],
+                "imageLinks": {"thumbnail": f"http://books.example/{i}.jpg"},
+            }} for n in range(10)
+        ]}}
+
+    # Notion のデータベース検索（100件ずつページ送り）
+    key = f"POST /v1/databases/{DATABASE_ID}/query"
+    for start in range(0, books, PAGE_SIZE):
+        has_more = start + PAGE_SIZE < books
+        cursor_key = key if start == 0 else f"{key}#cursor-{start}"
+        fixtures[cursor_key] = {"status": 200, "body": {
+            "object": "list",
+            "results": pages[start:start + PAGE_SIZE],
+            "has_more": has_more,
+            "next_cursor": f"cursor-{start + PAGE_SIZE}" if has_more else None,
+        }}
+    return fixtures
+
+def main():
+    parser = argparse.ArgumentParser(description="表紙同期（main.py）のベンチマーク")
+    parser.add_argument("--books", type=int, default=200, help="合成する本の数")
+    parser.add_argument("--latency", type=float, default=0.05, help="スタブの応答遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 を返す割合（0〜1）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="試す検索の並列数")
+    parser.add_argument("--rate", type=float, default=50.0, help="Google Books へのレート上限（回/秒）")
+    parser.add_argument("--write-rate", type=float, default=50.0, help="Notion へのレート上限（回/秒）")
+    args = parser.parse_args()
+
+    server = start_stub_server(make_fixtures(args.books), args.latency, args.error_rate)
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "NOTION_TOKEN": "bench",
+            "DATABASE_ID": DATABASE_ID,
+            "NOTION_BASE_URL": base,
+            "GOOGLE_BOOKS_API_URL": f"{base}/books/v1/volumes",
+            "SYNC_STATE_PATH": os.path.join(tmp, "sync_state.json"),
+            "LOOKUP_CACHE_PATH": os.path.join(tmp, "cache.sqlite3"),
+        })
+        import main as sync
+
+        print(f"📚 {args.books} 冊 / 遅延 {args.latency * 1000:.0f} ms / 429 率 {args.error_rate:.0%}")
+        for workers in args.workers:
+            sys.argv = [
+                "main.py", "--full", "--no-cache",
+                "--workers", str(workers), "--rate", str(args.rate),
+                "--write-workers", str(workers), "--write-rate", str(args.write_rate),
+            ]
+            server.stats.update(requests=0, **{"429": 0})
+            output = io.StringIO()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(output):
+                sync.main()
+            elapsed = time.perf_counter() - started
+            matched = output.getvalue().count("✅ マッチ")
+            print(f"workers={workers}: {args.books / elapsed:7.1f} 冊/秒（{elapsed:.2f} 秒, マッチ {matched} 冊, "
+                  f"リクエスト {server.stats['requests']} 回, 429 {server.stats['429']} 回）")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
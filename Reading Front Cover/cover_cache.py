@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+import threading
+
+# 表紙画像のローカルキャッシュ
+# 画像は内容の SHA-256 をファイル名にして保存するので、同じ画像は URL が違っても1つだけ持つ。
+# URL → ファイルの対応を index.json に残し、一度取得した URL は二度とダウンロードしない。
+CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+class CoverCache:
+    def __init__(self, folder, session):
+        self.folder = folder
+        self.session = session
+        self.index_path = os.path.join(folder, "index.json")
+        self.lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def fetch(self, url):
+        """表紙画像のローカルパスを返す（未取得ならダウンロードして保存）"""
+        with self.lock:
+            relative = self.index.get(url)
+        if relative and os.path.exists(os.path.join(self.folder, relative)):
+            return os.path.join(self.folder, relative)
+
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        ext = CONTENT_TYPES.get(response.headers.get("Content-Type", "").split(";")[0], ".img")
+        relative = os.path.join(digest[:2], digest + ext)
+        path = os.path.join(self.folder, relative)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.index[url] = relative
+        return path
+
+    def close(self):
+        with self.lock:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False, indent=1)
@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+import urllib.parse
+
+import httpx
+import requests
+from notion_client import Client
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Google Books / Notion 共通の HTTP まわり
+# ・keep-alive の接続プールを使い回す（1冊ごとに TLS 接続を張り直さない）
+# ・gzip で受け取る
+# ・ホストごとの同時接続数を制限する
+# ・429 / 5xx は Retry-After に従い、なければ指数バックオフで再試行する
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+PER_HOST_LIMIT = 4
+
+class LimitedSession(requests.Session):
+    """ホストごとの同時リクエスト数を制限する requests.Session"""
+
+    def __init__(self, per_host=PER_HOST_LIMIT):
+        super().__init__()
+        self.per_host = per_host
+        self.semaphores = {}
+        self.semaphores_lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        host = urllib.parse.urlsplit(url).netloc
+        with self.semaphores_lock:
+            semaphore = self.semaphores.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            return super().request(method, url, *args, **kwargs)
+
+def build_session(per_host=PER_HOST_LIMIT, retries=MAX_RETRIES):
+    retry = Retry(
+        total=retries,
+        backoff_factor=BACKOFF_SECONDS,
+        backoff_max=MAX_BACKOFF_SECONDS,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=per_host, pool_maxsize=per_host, max_retries=retry)
+    session = LimitedSession(per_host)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Google の API は User-Agent に "gzip" を含めると gzip で返す
+    session.headers.update({
+        "Accept-Encoding": "gzip",
+        "User-Agent": "python-scripts-notion-sync (gzip)",
+    })
+    return session
+
+def build_notion_client(auth, base_url=None, per_host=PER_HOST_LIMIT, event_hooks=None):
+    """接続プールの上限を決めた httpx クライアントで Notion クライアントを作る"""
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=per_host, max_keepalive_connections=per_host),
+        event_hooks=event_hooks,
+    )
+    options = {"auth": auth, "client": http_client}
+    if base_url:
+        options["base_url"] = base_url
+    return Client(**options)
+
+def retry_delay(attempt, retry_after=None):
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    # 指数バックオフ（同時に再試行しないよう少しずらす）
+    return min(BACKOFF_SECONDS * (2 ** attempt), MAX_BACKOFF_SECONDS) * random.uniform(0.5, 1.0)
+
+def notion_call(func, *args, retries=MAX_RETRIES, **kwargs):
+    """Notion API 呼び出しを 429 / 5xx / タイムアウト時に再試行する"""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except HTTPResponseError as e:
+            if e.status not in RETRY_STATUSES or attempt == retries:
+                raise
+            delay = retry_delay(attempt, e.headers.get("retry-after"))
+        except (RequestTimeoutError, httpx.TransportError):
+            if attempt == retries:
+                raise
+            delay = retry_delay(attempt)
+        time.sleep(delay)
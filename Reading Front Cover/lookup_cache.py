@@ -0,0 +1,76 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Google Books 検索結果のキャッシュ
+# 見つかった結果は長めに、見つからなかった結果は短めに保持し、件数が上限を超えたら古い順に捨てる（LRU）
+HIT_TTL = 30 * 24 * 3600
+MISS_TTL = 3 * 24 * 3600
+MAX_ENTRIES = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookups (
+    query TEXT PRIMARY KEY,
+    result TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+def normalize_query(title, author):
+    # 全角・半角、大文字・小文字、余分な空白の違いは同じ検索として扱う
+    query = unicodedata.normalize("NFKC", f"{title} {author}").casefold()
+    return re.sub(r"\s+", " ", query).strip()
+
+class LookupCache:
+    def __init__(self, path, hit_ttl=HIT_TTL, miss_ttl=MISS_TTL, max_entries=MAX_ENTRIES):
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(SCHEMA)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS lookups_accessed ON lookups (accessed_at)")
+
+    def get(self, title, author):
+        """(キャッシュにあるか, 結果) を返す。結果が None なら「見つからなかった」ことを覚えている"""
+        query = normalize_query(title, author)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result, stored_at FROM lookups WHERE query = ?", (query,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            result = json.loads(row[0]) if row[0] is not None else None
+            ttl = self.hit_ttl if result is not None else self.miss_ttl
+            if now - row[1] > ttl:
+                self.conn.execute("DELETE FROM lookups WHERE query = ?", (query,))
+                self.conn.commit()
+                return False, None
+            self.conn.execute("UPDATE lookups SET accessed_at = ? WHERE query = ?", (now, query))
+            self.conn.commit()
+            return True, result
+
+    def put(self, title, author, result):
+        query = normalize_query(title, author)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO lookups (query, result, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (query, json.dumps(result, ensure_ascii=False) if result is not None else None, now, now)
+            )
+            # 上限を超えた分は最後に使われたのが古いものから削除
+            self.conn.execute(
+                "DELETE FROM lookups WHERE query IN ("
+                " SELECT query FROM lookups ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
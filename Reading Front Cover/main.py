@@ -1,69 +1,80 @@
-from notion_client import Client
-from rapidfuzz import fuzz
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import argparse
+import json
 import os
-import requests
 import urllib.parse
-import time
+
+from cover_cache import CoverCache
+from http_session import build_notion_client, build_session, notion_call
+from lookup_cache import MISS_TTL, LookupCache
+from matching import best_match, book_info
+from rate_limit import TokenBucket
+from replay import Recorder
+from write_queue import NotionWriteQueue
 
 # .envの読み込み
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 DATABASE_ID = os.getenv("DATABASE_ID")
+# ローカルのスタブサーバーで試すときは差し替える
+GOOGLE_BOOKS_API_URL = os.getenv("GOOGLE_BOOKS_API_URL", "https://www.googleapis.com/books/v1/volumes")
+LOOKUP_CACHE_PATH = os.getenv("LOOKUP_CACHE_PATH", "google_books_cache.sqlite3")
+SYNC_STATE_PATH = os.getenv("SYNC_STATE_PATH", "sync_state.json")
+COVER_CACHE_DIR = os.getenv("COVER_CACHE_DIR", "covers")
+# スタブサーバー（stub_server.py）に向けるときは NOTION_BASE_URL も差し替える
+NOTION_BASE_URL = os.getenv("NOTION_BASE_URL")
+# 指定すると API の応答をこのファイルに記録する（stub_server.py で再生できる）
+RECORD_FIXTURES = os.getenv("RECORD_FIXTURES")
+
+recorder = Recorder(RECORD_FIXTURES) if RECORD_FIXTURES else None
 
-# Notionクライアント初期化
-notion = Client(auth=NOTION_TOKEN)
+# Notionクライアント・Google Books 用セッション初期化（接続プールと再試行つき）
+notion = build_notion_client(
+    NOTION_TOKEN, NOTION_BASE_URL,
+    event_hooks={"response": [recorder.httpx_hook]} if recorder else None
+)
+session = build_session()
+if recorder:
+    session.hooks["response"].append(recorder.requests_hook)
+
+# Google Books の候補を取得
+def fetch_google_books_candidates(query, max_results=10):
+    url = f"{GOOGLE_BOOKS_API_URL}?q={urllib.parse.quote(query)}&maxResults={max_results}"
+    response = session.get(url, timeout=30)
+    # 通信エラーは「見つからなかった」とは区別する（キャッシュしない）
+    response.raise_for_status()
+    return response.json().get("items", [])
 
 # Google Booksで最も近い本を探す
 def search_google_books_fuzzy(title, author):
-    query = f"{title} {author}"
-    url = f"https://www.googleapis.com/books/v1/volumes?q={urllib.parse.quote(query)}&maxResults=10"
-    response = requests.get(url)
-    if response.status_code != 200:
+    items = fetch_google_books_candidates(f"{title} {author}")
+    if not items:
         return None
-    data = response.json()
-    if "items" not in data:
+    return best_match(title, author, items)
+
+# ISBN で直接検索（一致するのは基本的に1冊なので、あいまい検索より安くて確実）
+def search_google_books_by_isbn(isbn):
+    items = fetch_google_books_candidates(f"isbn:{isbn}", max_results=1)
+    if not items:
         return None
+    found = book_info(items[0], 100)
+    found["isbn13"] = found["isbn13"] or isbn
+    return found
 
-    best_score = 0
-    best_match = None
-
-    for item in data["items"]:
-        info = item.get("volumeInfo", {})
-        found_title = info.get("title", "")
-        found_authors = " ".join(info.get("authors", []))
-
-        title_score = fuzz.token_sort_ratio(title, found_title)
-        author_score = fuzz.token_sort_ratio(author, found_authors)
-        score = (title_score + author_score) / 2
-
-        if score > best_score:
-            isbn13 = None
-            for id in info.get("industryIdentifiers", []):
-                if id.get("type") == "ISBN_13":
-                    isbn13 = id.get("identifier")
-            image_url = info.get("imageLinks", {}).get("thumbnail", None)
-            best_match = {
-                "isbn13": isbn13,
-                "image_url": image_url.replace("http://", "https://") if image_url else None,
-                "title": found_title,
-                "author": found_authors,
-                "score": score
-            }
-            best_score = score
-
-    return best_match if best_match and best_score >= 60 else None
-
-# Notionデータベースの全ページを取得
-def get_all_pages(database_id):
+# Notionデータベースの全ページを取得（filter を渡すと Notion 側で絞り込む）
+def get_all_pages(database_id, filter=None):
     results = []
     next_cursor = None
     while True:
-        response = notion.databases.query(
-            database_id=database_id,
-            start_cursor=next_cursor
-        ) if next_cursor else notion.databases.query(database_id=database_id)
+        query = {"database_id": database_id}
+        if filter:
+            query["filter"] = filter
+        if next_cursor:
+            query["start_cursor"] = next_cursor
+        response = notion_call(notion.databases.query, **query)
         results.extend(response["results"])
         if response.get("has_more"):
             next_cursor = response["next_cursor"]
@@ -71,8 +82,54 @@ def get_all_pages(database_id):
             break
     return results
 
-# Notionページを更新
-def update_page(page_id, isbn=None, image_url=None):
+# ISBN か表紙URLが空のページだけを取得（since があればそれ以降に編集されたページだけ）
+def get_pages_to_update(database_id, since=None):
+    missing = {
+        "or": [
+            {"property": "ISBN", "rich_text": {"is_empty": True}},
+            {"property": "表紙（画像URL）", "url": {"is_empty": True}},
+        ]
+    }
+    if since:
+        missing = {
+            "and": [
+                {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}},
+                missing,
+            ]
+        }
+    return get_all_pages(database_id, missing)
+
+# 再試行するページを ID で取り直す。(取得できたページ, 削除・アーカイブされていたページID) を返す
+def get_retry_pages(page_ids):
+    pages, gone = [], []
+    for page_id in page_ids:
+        try:
+            page = notion_call(notion.pages.retrieve, page_id=page_id)
+        except Exception as e:
+            if getattr(e, "status", None) == 404:
+                gone.append(page_id)
+            else:
+                print(f"❌ 再試行ページの取得エラー: {page_id}: {e}")
+            continue
+        if page.get("archived"):
+            gone.append(page_id)
+        else:
+            pages.append(page)
+    return pages, gone
+
+# 前回の同期で見た最新の last_edited_time と、再試行するページ（ID → 再試行する時刻）を読み書きする
+def load_sync_state():
+    if not os.path.exists(SYNC_STATE_PATH):
+        return {}
+    with open(SYNC_STATE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_sync_state(state):
+    with open(SYNC_STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+# 更新するプロパティを組み立てる
+def page_properties(isbn=None, image_url=None):
     props = {}
     if isbn:
         props["ISBN"] = {
@@ -82,38 +139,157 @@ def update_page(page_id, isbn=None, image_url=None):
         props["表紙（画像URL）"] = {
             "url": image_url
         }
+    return props
+
+# Notionページを更新
+def update_page(page_id, isbn=None, image_url=None):
+    props = page_properties(isbn, image_url)
     if props:
-        notion.pages.update(page_id=page_id, properties=props)
+        write_properties(page_id, props)
+
+def write_properties(page_id, props):
+    notion_call(notion.pages.update, page_id=page_id, properties=props)
+
+# ISBN か表紙が未設定のページから (ページID, タイトル, 著者, 登録済みISBN) を取り出す
+def book_to_search(page):
+    props = page["properties"]
+    title_data = props.get("タイトル", {}).get("title", [])
+    author_data = props.get("著者", {}).get("rich_text", [])
+    isbn_data = props.get("ISBN", {}).get("rich_text", [])
+    image_url = props.get("表紙（画像URL）", {}).get("url", "")
+
+    if isbn_data and image_url:
+        return None
+
+    # ISBN があればタイトル・著者がなくても ISBN で探せる
+    isbn = isbn_data[0]["text"]["content"].replace("-", "").strip() if isbn_data else None
+    if not isbn and (not title_data or not author_data):
+        return None
+
+    title = title_data[0]["text"]["content"] if title_data else ""
+    author = author_data[0]["text"]["content"] if author_data else ""
+    return page["id"], title, author, isbn
 
 # メイン処理
 def main():
-    pages = get_all_pages(DATABASE_ID)
-    for page in pages:
-        props = page["properties"]
-        title_data = props.get("タイトル", {}).get("title", [])
-        author_data = props.get("著者", {}).get("rich_text", [])
-        isbn_data = props.get("ISBN", {}).get("rich_text", [])
-        image_url = props.get("表紙（画像URL）", {}).get("url", "")
-
-        if not title_data or not author_data:
-            continue
+    parser = argparse.ArgumentParser(description="Notionの読書記録にISBNと表紙URLを補完する")
+    parser.add_argument("--workers", type=int, default=4, help="同時に実行する検索の数")
+    parser.add_argument("--rate", type=float, default=2.0, help="Google Books への1秒あたりの最大リクエスト数")
+    parser.add_argument("--no-cache", action="store_true", help="検索結果のキャッシュを使わない")
+    parser.add_argument("--full", action="store_true", help="前回以降に編集されたページだけでなく、未設定のページをすべて取得する")
+    parser.add_argument("--download-covers", action="store_true", help="表紙画像をローカルのキャッシュにも保存する")
+    parser.add_argument("--write-workers", type=int, default=3, help="Notion への同時書き込み数")
+    parser.add_argument("--write-rate", type=float, default=3.0, help="Notion への1秒あたりの最大書き込み数")
+    args = parser.parse_args()
 
-        title = title_data[0]["text"]["content"]
-        author = author_data[0]["text"]["content"]
+    # 前回の同期以降に編集された、ISBN か表紙が空のページだけを Notion 側で絞り込んで取得
+    state = load_sync_state()
+    since = None if args.full else state.get("last_edited_time")
+    pages = get_pages_to_update(DATABASE_ID, since)
+    print(f"📥 対象ページ: {len(pages)} 件" + (f"（{since} 以降に編集）" if since else ""))
 
-        if isbn_data and image_url:
-            continue
+    # 前回までに解決できなかったページは、再試行の時刻が来たものだけ ID で取り直す
+    now = datetime.now()
+    retry = state.get("retry", {})
+    seen = {page["id"] for page in pages}
+    due = [page_id for page_id, after in retry.items()
+           if page_id not in seen and datetime.fromisoformat(after) <= now]
+    if due:
+        retry_pages, gone = get_retry_pages(due)
+        pages += retry_pages
+        for page_id in gone:
+            del retry[page_id]
+        print(f"🔁 再試行ページ: {len(retry_pages)} 件")
+    books = [book for book in map(book_to_search, pages) if book]
 
-        print(f"🔍 検索中: {title} / {author}")
-        book_info = search_google_books_fuzzy(title, author)
+    # 検索はレート制限付きで並列に、更新は書き込みキューに渡して検索と並行して送る
+    bucket = TokenBucket(args.rate)
+    cache = None if args.no_cache else LookupCache(LOOKUP_CACHE_PATH)
+    covers = CoverCache(COVER_CACHE_DIR, session) if args.download_covers else None
+    writes = NotionWriteQueue(write_properties, args.write_workers, args.write_rate)
 
-        if book_info:
-            print(f"✅ マッチ: {book_info['title']} by {book_info['author']} (Score: {int(book_info['score'])})")
-            update_page(page["id"], book_info["isbn13"], book_info["image_url"])
-        else:
-            print("⚠️ 見つかりませんでした")
+    # 検索に失敗したページ（見つからなかったページとは分けて、次回すぐに再試行する）
+    search_errors = set()
+
+    def cached_lookup(page_id, title, author, lookup):
+        # 解決済み・最近見つからなかった本は Google Books に問い合わせない
+        if cache:
+            hit, found = cache.get(title, author)
+            if hit:
+                return found
+        bucket.acquire()
+        try:
+            found = lookup()
+        except Exception as e:
+            print(f"❌ 検索エラー: {title} / {author}: {e}")
+            search_errors.add(page_id)
+            return None
+        if cache:
+            cache.put(title, author, found)
+        return found
+
+    def search(book):
+        page_id, title, author, isbn = book
+        found = None
+        # ISBN が登録済みなら ISBN で直接引き、見つからなければあいまい検索に回す
+        if isbn:
+            found = cached_lookup(page_id, f"isbn:{isbn}", "", lambda: search_google_books_by_isbn(isbn))
+        if not found and title and author:
+            found = cached_lookup(page_id, title, author, lambda: search_google_books_fuzzy(title, author))
+        if found and covers and found["image_url"]:
+            try:
+                found = dict(found, cover_path=covers.fetch(found["image_url"]))
+            except Exception as e:
+                print(f"❌ 表紙の取得エラー: {found['image_url']}: {e}")
+        return found
+
+    # 登録済みの表紙URL（同じURLは書き直さない）
+    current_urls = {page["id"]: page["properties"].get("表紙（画像URL）", {}).get("url") for page in pages}
+    # 見つからなかったページ
+    not_found = set()
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for (page_id, title, author, isbn), found in zip(books, pool.map(search, books)):
+                print(f"🔍 検索中: {title} / {author}" + (f" (ISBN: {isbn})" if isbn else ""))
+                if found:
+                    print(f"✅ マッチ: {found['title']} by {found['author']} (Score: {int(found['score'])})")
+                    # 登録済みの ISBN と、既に同じ値が入っている表紙URLは書き直さない
+                    image_url = found["image_url"] if found["image_url"] != current_urls.get(page_id) else None
+                    writes.put(page_id, page_properties(None if isbn else found["isbn13"], image_url))
+                else:
+                    print("⚠️ 見つかりませんでした")
+                    not_found.add(page_id)
+    finally:
+        results = writes.close()
+        if cache:
+            cache.close()
+        if covers:
+            covers.close()
+        if recorder:
+            recorder.save()
+
+    # 書き込み結果の報告
+    failed = {page_id: error for page_id, error in results.items() if error}
+    print(f"📝 Notion 更新: 成功 {len(results) - len(failed)} 件 / 失敗 {len(failed)} 件（まとめた更新 {writes.coalesced} 件）")
+    for page_id, error in failed.items():
+        print(f"❌ 更新エラー: {page_id}: {error}")
+
+    # 次回はここまでに見たページより後に編集されたものだけを取得する
+    edited_times = [page["last_edited_time"] for page in pages if page.get("last_edited_time")]
+    if edited_times:
+        state["last_edited_time"] = max(edited_times + ([since] if since else []))
 
-        time.sleep(1)
+    # 解決できなかったページは ID で覚えておき、再試行の時刻が来たら取り直す
+    # 見つからなかった本は検索キャッシュが切れる頃、検索エラー・書き込み失敗は次回の実行で
+    seen = {page["id"] for page in pages}
+    retry = {page_id: after for page_id, after in retry.items() if page_id not in seen}
+    for page_id in not_found - search_errors:
+        retry[page_id] = (now + timedelta(seconds=MISS_TTL)).isoformat(timespec="seconds")
+    for page_id in (not_found & search_errors) | set(failed):
+        retry[page_id] = now.isoformat(timespec="seconds")
+    state["retry"] = retry
+    save_sync_state(state)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,44 @@
+from rapidfuzz import fuzz
+
+# Google Books の候補とのあいまい一致を採点する
+# main.py は1冊ずつ（候補10件程度）採点するので、rapidfuzz.process.cpdist の一括採点は準備コストの方が大きく、
+# 全冊をまとめても速くならなかった（bench_matching.py）。そのため候補を1件ずつ採点する
+
+TITLE_WEIGHT = 0.5
+AUTHOR_WEIGHT = 0.5
+SCORE_CUTOFF = 60
+
+def candidate_fields(item):
+    info = item.get("volumeInfo", {})
+    return info.get("title", ""), " ".join(info.get("authors", []))
+
+def book_info(item, score):
+    info = item.get("volumeInfo", {})
+    found_title, found_authors = candidate_fields(item)
+    isbn13 = None
+    for id in info.get("industryIdentifiers", []):
+        if id.get("type") == "ISBN_13":
+            isbn13 = id.get("identifier")
+    image_url = info.get("imageLinks", {}).get("thumbnail", None)
+    return {
+        "isbn13": isbn13,
+        "image_url": image_url.replace("http://", "https://") if image_url else None,
+        "title": found_title,
+        "author": found_authors,
+        "score": score
+    }
+
+def best_match(title, author, items, title_weight=TITLE_WEIGHT, author_weight=AUTHOR_WEIGHT, cutoff=SCORE_CUTOFF):
+    """
+    items: Google Books の items のリスト。
+    title と author の加重平均が最も高い候補（cutoff 未満なら None）を返す。同点なら先に出てきた候補を優先する
+    """
+    best_score = 0
+    best_item = None
+    for item in items:
+        found_title, found_authors = candidate_fields(item)
+        score = fuzz.token_sort_ratio(title, found_title) * title_weight + fuzz.token_sort_ratio(author, found_authors) * author_weight
+        if score > best_score:
+            best_item = item
+            best_score = score
+    return book_info(best_item, best_score) if best_item and best_score >= cutoff else None
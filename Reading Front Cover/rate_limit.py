@@ -0,0 +1,24 @@
+import threading
+import time
+
+# トークンバケット方式のレート制限（複数スレッドから共有して使う）
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate                      # 1秒あたりに補充されるトークン数
+        self.capacity = capacity or max(1, rate)  # 一度に使える最大トークン数（バースト）
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンが1つ使えるようになるまで待つ"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
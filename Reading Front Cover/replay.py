@@ -0,0 +1,59 @@
+import json
+import os
+import threading
+import urllib.parse
+
+# API 応答の記録（record）と、記録した応答を返すスタブ用の照合キー
+# 記録は Google Books（requests）と Notion（httpx）の両方の応答フックから同じ形式で行う
+
+def request_key(method, url, body=None):
+    """記録と再生で共通の照合キー（ホストは無視し、Notion の検索はページ送りのカーソルだけ見る）"""
+    parts = urllib.parse.urlsplit(url)
+    key = f"{method.upper()} {parts.path}"
+    if parts.query:
+        key += f"?{parts.query}"
+    if body and method.upper() == "POST" and parts.path.endswith("/query"):
+        try:
+            cursor = json.loads(body).get("start_cursor")
+        except ValueError:
+            cursor = None
+        if cursor:
+            key += f"#{cursor}"
+    return key
+
+class Recorder:
+    """応答を fixtures（JSON）に書き溜める"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.fixtures = json.load(f)
+        else:
+            self.fixtures = {}
+
+    def add(self, key, status, body):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return
+        with self.lock:
+            self.fixtures[key] = {"status": status, "body": data}
+
+    def requests_hook(self, response, *args, **kwargs):
+        # requests の response フック（Google Books）
+        request = response.request
+        self.add(request_key(request.method, request.url, request.body), response.status_code, response.content)
+        return response
+
+    def httpx_hook(self, response):
+        # httpx の response フック（Notion）
+        response.read()
+        request = response.request
+        self.add(request_key(request.method, str(request.url), request.content), response.status_code, response.content)
+
+    def save(self):
+        with self.lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.fixtures, f, ensure_ascii=False, indent=1)
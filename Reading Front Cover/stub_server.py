@@ -0,0 +1,95 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from replay import request_key
+
+# 記録した fixtures を返すローカルのスタブサーバー（Google Books / Notion 共用）
+# 応答の遅延と 429 の混入率を指定できる
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server = self.server
+        with server.stats_lock:
+            server.stats["requests"] += 1
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            with server.stats_lock:
+                server.stats["429"] += 1
+            self.reply(429, {"object": "error", "status": 429, "code": "rate_limited", "message": "rate limited"},
+                       {"Retry-After": str(server.retry_after)})
+            return
+
+        fixture = server.fixtures.get(request_key(self.command, self.path, body))
+        if fixture:
+            self.reply(fixture["status"], fixture["body"])
+        elif self.command == "PATCH" and self.path.startswith("/v1/pages/"):
+            # 記録にないページ更新は受け付けたことにする
+            self.reply(200, {"object": "page", "id": self.path.rsplit("/", 1)[-1]})
+        elif self.path.startswith("/books/"):
+            self.reply(200, {"kind": "books#volumes", "totalItems": 0})
+        else:
+            self.reply(404, {"object": "error", "status": 404, "code": "object_not_found", "message": self.path})
+
+    do_GET = handle_request
+    do_POST = handle_request
+    do_PATCH = handle_request
+
+def start_stub_server(fixtures, latency=0.0, error_rate=0.0, retry_after=1, port=0):
+    """バックグラウンドでスタブサーバーを起動し、サーバーを返す（server.server_port でポート番号）"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.fixtures = fixtures
+    server.latency = latency
+    server.error_rate = error_rate
+    server.retry_after = retry_after
+    server.stats = {"requests": 0, "429": 0}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="記録した API 応答を返すスタブサーバー")
+    parser.add_argument("fixtures", help="RECORD_FIXTURES で記録した JSON")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="1リクエストあたりの遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 を返す割合（0〜1）")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 に付ける Retry-After（秒）")
+    args = parser.parse_args()
+
+    with open(args.fixtures, encoding="utf-8") as f:
+        fixtures = json.load(f)
+    server = start_stub_server(fixtures, args.latency, args.error_rate, args.retry_after, args.port)
+    base = f"http://127.0.0.1:{server.server_port}"
+    print(f"🧪 スタブサーバー起動: {base}")
+    print(f"   GOOGLE_BOOKS_API_URL={base}/books/v1/volumes")
+    print(f"   NOTION_BASE_URL={base}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rate_limit import TokenBucket
+
+# Notion への書き込みキュー（write-behind）
+# ・同じページへの更新は、送信前ならプロパティをまとめて1回の更新にする
+# ・同じページの更新が同時に2本走らないようにする
+# ・全体の送信レートと同時実行数を制限する
+# ・送信待ち・送信中のページが多すぎるときは put() で待たせる（検索側が先に進みすぎないように）
+class NotionWriteQueue:
+    def __init__(self, write, workers=3, rate=3.0):
+        self.write = write            # write(page_id, properties)
+        self.bucket = TokenBucket(rate)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers * 2)   # 同時に抱えるページ数の上限
+        self.lock = threading.Lock()
+        self.pending = {}             # page_id → まだ送っていないプロパティ
+        self.inflight = set()         # 送信中の page_id
+        self.results = {}             # page_id → None（成功）またはエラー
+        self.coalesced = 0
+
+    def put(self, page_id, properties):
+        if not properties:
+            return
+        # 上限に達していれば、どれかのページを送り終えるまで待つ
+        self.slots.acquire()
+        with self.lock:
+            if page_id in self.pending:
+                self.pending[page_id].update(properties)
+                self.coalesced += 1
+                self.slots.release()
+                return
+            self.pending[page_id] = dict(properties)
+            if page_id in self.inflight:
+                # 送信中のページは、送り終えた後に同じ枠のまま続けて送る
+                self.slots.release()
+                return
+            self.inflight.add(page_id)
+            self.pool.submit(self._send, page_id)
+
+    def _send(self, page_id):
+        while True:
+            self.bucket.acquire()
+            with self.lock:
+                properties = self.pending.pop(page_id)
+            try:
+                self.write(page_id, properties)
+                error = None
+            except Exception as e:
+                error = e
+            with self.lock:
+                self.results[page_id] = error
+                # 送信中に同じページへの更新が来ていれば続けて送る
+                if page_id not in self.pending:
+                    self.inflight.discard(page_id)
+                    self.slots.release()
+                    return
+
+    def close(self):
+        """残りをすべて送り終えるまで待ち、ページごとの結果を返す"""
+        self.pool.shutdown(wait=True)
+        return self.results
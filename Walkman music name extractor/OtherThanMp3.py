@@ -1,19 +1,18 @@
-import os
+from scanner import Census, iter_files
 
 music_folder = r"E:\MUSIC"
 
-# mp3以外の拡張子を記録するセット
-non_mp3_extensions = set()
+# mp3以外の拡張子を記録する（extractor.py と同じ走査部品で1回だけ走査）
+census = Census(['.mp3'])
+for _ in iter_files(music_folder, exts=(), census=census):
+    pass
 
-for root, dirs, files in os.walk(music_folder):
-    for file in files:
-        ext = os.path.splitext(file)[1].lower()
-        if ext != '.mp3':
-            non_mp3_extensions.add(ext)
+non_mp3_extensions = census.unsupported_exts()
 
 if non_mp3_extensions:
     print("🎧 .mp3以外の拡張子が見つかりました：")
-    for ext in sorted(non_mp3_extensions):
+    for ext in non_mp3_extensions:
         print(f" - {ext}")
+    print(census.report())
 else:
     print("✅ フォルダ内はすべて.mp3ファイルでした。")
@@ -1,6 +1,76 @@
 from mutagen.id3 import ID3
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import io
+import json
+import os
+import sys
+
+from scanner import iter_files
 
 file_path = r"E:\MUSIC\2 classical\Ave Maria, D. 839.mp3"
-tags = ID3(file_path)
-for key, value in tags.items():
-    print(f"{key}: {value}")
+
+def read_id3_region(path):
+    """ID3v2 タグの領域（先頭10バイトのヘッダー＋タグ本体）だけを読み込む。音声部分は読まない"""
+    with open(path, 'rb') as f:
+        header = f.read(10)
+        if len(header) < 10 or header[:3] != b'ID3':
+            return None
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        # フッター付き（v2.4）なら10バイト多く読む
+        if header[5] & 0x10:
+            size += 10
+        return header + f.read(size)
+
+def frame_value(frame):
+    """
+    フレームの出力値。テキストなどは str() のまま、
+    バイナリを持つフレーム（APIC / GEOB / PRIV）は中身の代わりに種類と大きさだけを出す
+    """
+    if not hasattr(frame, 'data'):
+        return str(frame)
+    value = {name: getattr(frame, name) for name in ('mime', 'desc', 'owner') if hasattr(frame, name)}
+    if hasattr(frame, 'type'):
+        value['type'] = int(frame.type)
+    value['bytes'] = len(frame.data)
+    return value
+
+def dump_tags(path, frame_ids=None):
+    try:
+        region = read_id3_region(path)
+        frames = {}
+        if region is not None:
+            tags = ID3(io.BytesIO(region), load_v1=False)
+            for key, value in tags.items():
+                if frame_ids and key[:4] not in frame_ids:
+                    continue
+                frames[key] = frame_value(value)
+        return {'path': path, 'frames': frames}
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+
+def main():
+    parser = argparse.ArgumentParser(description="ID3 タグを JSON Lines で一覧出力する")
+    parser.add_argument("target", nargs="?", default=file_path, help="ファイルまたはフォルダ（フォルダなら配下すべて）")
+    parser.add_argument("--frames", help="出力するフレームID（カンマ区切り。例: TIT2,TPE1,TALB）")
+    parser.add_argument("--workers", type=int, default=8, help="並列に読み込むワーカー数")
+    parser.add_argument("--output", help="出力ファイル（省略時は標準出力）")
+    args = parser.parse_args()
+
+    frame_ids = set(args.frames.split(',')) if args.frames else None
+    if os.path.isdir(args.target):
+        paths = (path for path, _, _ in iter_files(args.target, {'.mp3'}))
+    else:
+        paths = [args.target]
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for record in pool.map(lambda path: dump_tags(path, frame_ids), paths):
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
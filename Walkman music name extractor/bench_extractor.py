@@ -0,0 +1,86 @@
+# extractor.py の並列解析ベンチマーク
+# 合成した MP3 / FLAC を一時フォルダに作り、ワーカー数ごとの解析速度（files/s）を測る
+import argparse
+import os
+import struct
+import tempfile
+import time
+
+from mutagen.easyid3 import EasyID3
+from mutagen.flac import FLAC
+from mutagen.id3 import ID3
+
+import extractor
+from exporters import to_csv_row
+from music_index import MusicIndex
+from scanner import iter_files
+
+# MPEG1 Layer3 128kbps 44.1kHz のフレーム（417バイト）
+MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x64]) + b'\x00' * 413
+
+def make_mp3(path, i, frames):
+    with open(path, 'wb') as f:
+        f.write(MP3_FRAME * frames)
+    ID3().save(path)
+    tags = EasyID3(path)
+    tags['title'] = f"Synthetic Track {i}"
+    tags['artist'] = "Bench Artist"
+    tags['album'] = f"Bench Album {i // 10}"
+    tags.save()
+
+def make_flac(path, i, samples):
+    # STREAMINFO だけを持つ最小の FLAC（44.1kHz / 2ch / 16bit）
+    streaminfo = struct.pack('>HH', 4096, 4096) + b'\x00' * 6
+    packed = (44100 << 44) | (1 << 41) | (15 << 36) | samples
+    streaminfo += packed.to_bytes(8, 'big') + b'\x00' * 16
+    with open(path, 'wb') as f:
+        f.write(b'fLaC' + bytes([0x80, 0, 0, len(streaminfo)]) + streaminfo)
+        f.write(b'\x00' * 4096)
+    audio = FLAC(path)
+    audio['title'] = f"Synthetic Track {i}"
+    audio['artist'] = "Bench Artist"
+    audio.save()
+
+def build_corpus(folder, count):
+    for i in range(count):
+        sub = os.path.join(folder, f"disc{i // 100:03}")
+        os.makedirs(sub, exist_ok=True)
+        if i % 4 == 0:
+            make_flac(os.path.join(sub, f"track{i:05}.flac"), i, 44100 * 180)
+        else:
+            make_mp3(os.path.join(sub, f"track{i:05}.mp3"), i, 50)
+
+def run(folder, workers, use_processes, header_only):
+    index = MusicIndex(':memory:')
+    started = time.perf_counter()
+    rows = [
+        to_csv_row(track)
+        for _, _, track, _ in extractor.extract_tracks(
+            iter_files(folder, extractor.supported_exts), index, workers, use_processes, header_only
+        )
+    ]
+    elapsed = time.perf_counter() - started
+    index.close()
+    return rows, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="extractor.py の並列解析ベンチマーク")
+    parser.add_argument("--files", type=int, default=2000, help="合成するファイル数")
+    parser.add_argument("--processes", action="store_true", help="プロセスプールで測る")
+    parser.add_argument("--header-only", action="store_true", help="--header-only で測る")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"🛠 合成コーパスを作成中: {args.files} 件")
+        build_corpus(folder, args.files)
+
+        baseline = None
+        for workers in (1, 2, 4, 8):
+            rows, elapsed = run(folder, workers, args.processes, args.header_only)
+            if baseline is None:
+                baseline = rows
+            same = "一致" if rows == baseline else "不一致"
+            print(f"workers={workers}: {len(rows) / elapsed:8.1f} files/s（{elapsed:.2f} 秒, 逐次との比較: {same}）")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,50 @@
 from mutagen.id3 import ID3, TIT2
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
+import hashlib
+import json
 import os
 import re
 
+from scanner import iter_files
+
 def sanitize_filename(name):
     # ファイル名に使えない文字を削除
     return re.sub(r'[\\/*?:"<>|]', '', name)
 
-def standardize_title_and_rename(file_path):
+# 処理済みファイルの記録（パスごとに mtime・サイズ・タグのハッシュ）
+ledger_path = "composernamechanger_done.json"
+
+def load_ledger():
+    if not os.path.exists(ledger_path):
+        return {}
+    with open(ledger_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_ledger(ledger):
+    tmp_path = ledger_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(ledger, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, ledger_path)
+
+def frame_hash(title, performer):
+    return hashlib.sha1(f"{title}\0{performer}".encode('utf-8')).hexdigest()
+
+def standardize_title(title, performer):
+    # 「曲名 / 演奏者 / 演奏者」のように重複した演奏者名は1つにまとめる
+    suffix = f" / {performer}"
+    while title.endswith(suffix):
+        title = title[:-len(suffix)].rstrip()
+    return title + suffix
+
+def plan_file(file_path, st=None, ledger=None):
+    """1ファイル分の変更内容（曲名の書き換え・リネーム）を計算する。書き込みはしない"""
+    record = (ledger or {}).get(file_path)
+    # 前回処理した時から mtime もサイズも変わっていなければタグも読まない
+    if record and st and record['mtime_ns'] == st.st_mtime_ns and record['size'] == st.st_size:
+        return {'path': file_path, 'status': 'done'}
+
     try:
         audio = ID3(file_path)
 
@@ -14,36 +52,176 @@ def standardize_title_and_rename(file_path):
         performer_frame = audio.get('TPE3') or audio.get('TPE1')  # 指揮者 > 演奏者
 
         if not title_frame or not performer_frame:
-            print(f"⚠️ Skipped (missing title or performer): {file_path}")
-            return
+            return {'path': file_path, 'status': 'skip', 'reason': 'missing title or performer'}
 
         title = title_frame.text[0].strip()
         performer = performer_frame.text[0].strip()
 
-        new_title = f"{title} / {performer}"
-        audio['TIT2'] = TIT2(encoding=3, text=new_title)
-        audio.save()
+        # 記録済みのタグと同じ内容なら処理済み
+        if record and record['hash'] == frame_hash(title_frame.text[0], performer):
+            return {'path': file_path, 'status': 'done'}
+
+        # すでに「曲名 / 演奏者」になっていればタグは書き換えない
+        new_title = standardize_title(title, performer)
 
         # ファイル名も変更（拡張子はそのまま）
         dir_name = os.path.dirname(file_path)
         ext = os.path.splitext(file_path)[1]
-        new_file_name = sanitize_filename(new_title) + ext
-        new_path = os.path.join(dir_name, new_file_name)
+        new_path = os.path.join(dir_name, sanitize_filename(new_title) + ext)
 
-        if file_path != new_path:
-            os.rename(file_path, new_path)
-            print(f"✔ Updated: {file_path} → {new_file_name}")
-        else:
-            print(f"✔ Title updated (filename unchanged): {file_path}")
+        return {
+            'path': file_path, 'status': 'ok',
+            'old_title': title_frame.text[0], 'new_title': new_title,
+            'retag': new_title != title_frame.text[0],
+            'new_path': new_path, 'performer': performer,
+        }
 
     except Exception as e:
-        print(f"❌ Error processing {file_path}: {e}")
+        return {'path': file_path, 'status': 'error', 'reason': str(e)}
+
+def path_key(path):
+    # Windows ではファイル名の大文字・小文字を区別しない
+    return os.path.normcase(path).casefold()
+
+def build_plan(music_folder, workers=8, ledger=None):
+    """フォルダ全体の計画を並列に作り、サニタイズ後のファイル名の衝突を検出する"""
+    files = list(iter_files(music_folder, {'.mp3'}))
+    paths = [path for path, _, _ in files]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        plan = list(pool.map(lambda item: plan_file(item[0], item[2], ledger), files))
+
+    existing = {path_key(path) for path in paths}
+    targets = {}
+    for action in plan:
+        if action['status'] == 'ok':
+            targets.setdefault(path_key(action['new_path']), []).append(action)
+
+    for key, actions in targets.items():
+        renamed = [a for a in actions if path_key(a['path']) != key]
+        if not renamed:
+            continue
+        # 同じ名前になるファイルが複数ある／既存の別ファイルと同じ名前になる
+        if len(actions) > 1 or key in existing or os.path.exists(actions[0]['new_path']):
+            for action in renamed:
+                action['status'] = 'collision'
+                action['reason'] = f"target already taken: {action['new_path']}"
+
+    return plan
+
+def needs_change(action):
+    return action['status'] == 'ok' and (action['retag'] or action['path'] != action['new_path'])
+
+def remember(ledger, path, title, performer):
+    st = os.stat(path)
+    ledger[path] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'hash': frame_hash(title, performer)}
+
+def apply_plan(plan, journal_path, ledger):
+    """計画をまとめて適用し、取り消せるように1件ごとに変更前にジャーナルへ記録する"""
+    for action in plan:
+        if action['status'] in ('skip', 'error', 'collision'):
+            print(f"⚠️ Skipped ({action['status']}: {action['reason']}): {action['path']}")
+        elif action['status'] == 'ok' and not needs_change(action):
+            # 既に揃っているファイルも記録して、次回はタグを読まずに済ませる
+            remember(ledger, action['path'], action['new_title'], action['performer'])
+
+    # 変更のないファイルには一切書き込まない
+    todo = [action for action in plan if needs_change(action)]
+    if not todo:
+        return 0
+
+    changed = 0
+    with open(journal_path, 'a', encoding='utf-8') as journal:
+        for action in todo:
+            file_path = action['path']
+            rename = file_path != action['new_path']
+            try:
+                # 先に記録してからファイルを変える（曲名の書き換え後にリネームで失敗しても元に戻せる）
+                journal.write(json.dumps({
+                    'old_path': file_path, 'new_path': action['new_path'],
+                    'old_title': action['old_title'], 'new_title': action['new_title'],
+                    'retag': action['retag'],
+                }, ensure_ascii=False) + '\n')
+                journal.flush()
+
+                if action['retag']:
+                    audio = ID3(file_path)
+                    audio['TIT2'] = TIT2(encoding=3, text=action['new_title'])
+                    audio.save()
+                if rename:
+                    os.rename(file_path, action['new_path'])
+                changed += 1
+                ledger.pop(file_path, None)
+                remember(ledger, action['new_path'], action['new_title'], action['performer'])
+
+                if rename:
+                    print(f"✔ Updated: {file_path} → {os.path.basename(action['new_path'])}")
+                else:
+                    print(f"✔ Title updated (filename unchanged): {file_path}")
+
+            except Exception as e:
+                print(f"❌ Error processing {file_path}: {e}")
+    return changed
+
+def rollback(journal_path, ledger):
+    """ジャーナルを逆順にたどって、リネームと曲名を元に戻す（途中までしか適用されなかった記録も扱う）"""
+    with open(journal_path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+
+    for entry in reversed(entries):
+        ledger.pop(entry['new_path'], None)
+        try:
+            path = entry['new_path']
+            if entry['new_path'] != entry['old_path']:
+                # リネーム前に失敗した記録なら、ファイルは元の名前のまま
+                if os.path.exists(entry['new_path']) or not os.path.exists(entry['old_path']):
+                    os.rename(entry['new_path'], entry['old_path'])
+                path = entry['old_path']
+            if entry['retag']:
+                audio = ID3(path)
+                audio['TIT2'] = TIT2(encoding=3, text=entry['old_title'])
+                audio.save()
+            print(f"↩️ Restored: {entry['old_path']}")
+        except Exception as e:
+            print(f"❌ Error restoring {entry['old_path']}: {e}")
 
 # 処理対象のフォルダ
 music_folder = r"E:\MUSIC\2 classical"
 
-for root, _, files in os.walk(music_folder):
-    for file in files:
-        if file.lower().endswith('.mp3'):
-            file_path = os.path.join(root, file)
-            standardize_title_and_rename(file_path)
+def main():
+    parser = argparse.ArgumentParser(description="クラシックの曲名を「曲名 / 演奏者」に揃えてリネームする")
+    parser.add_argument("--dry-run", action="store_true", help="計画を表示するだけで書き込まない")
+    parser.add_argument("--rollback", metavar="JOURNAL", help="ジャーナルを使って変更を元に戻す")
+    parser.add_argument("--workers", type=int, default=8, help="計画作成時の並列数")
+    args = parser.parse_args()
+
+    ledger = load_ledger()
+    if args.rollback:
+        rollback(args.rollback, ledger)
+        save_ledger(ledger)
+        return
+
+    plan = build_plan(music_folder, args.workers, ledger)
+    pending = [a for a in plan if a['status'] not in ('ok', 'done') or needs_change(a)]
+
+    if args.dry_run:
+        for action in pending:
+            if action['status'] == 'ok':
+                print(f"📝 {action['path']} → {os.path.basename(action['new_path'])}")
+            else:
+                print(f"⚠️ {action['status']}: {action['path']} ({action['reason']})")
+        print(f"🔍 {len(plan)} 件中 {len(pending)} 件に変更・警告があります（dry-run）")
+        return
+
+    journal_path = f"composernamechanger_journal_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+    changed = apply_plan(plan, journal_path, ledger)
+    save_ledger(ledger)
+    if changed:
+        print(f"✅ {changed} 件を変更しました。取り消し: --rollback {journal_path}")
+    elif os.path.exists(journal_path):
+        # すべて失敗しても、途中まで書き換えたファイルはジャーナルから戻せる
+        print(f"⚠️ 変更できたファイルはありませんでした。途中までの変更の取り消し: --rollback {journal_path}")
+    else:
+        print("✅ 変更はありませんでした。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import csv
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+
+from extractor import index_db
+from music_index import MusicIndex
+
+# 重複曲の検出
+# extractor.py の索引（曲名・アーティスト・再生時間・サイズ）を使い、
+# 再生時間とサイズで候補を絞ってから、同じ候補の中だけで音声部分をハッシュする
+
+output_csv = "walkman_duplicates.csv"
+
+# 部分ハッシュで読む先頭・末尾のバイト数
+PARTIAL_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+def audio_payload(path, size):
+    """ID3v2（先頭）と ID3v1（末尾128バイト）を除いた音声部分の (開始位置, 長さ)"""
+    start, end = 0, size
+    with open(path, 'rb') as f:
+        header = f.read(10)
+        if len(header) == 10 and header[:3] == b'ID3':
+            start = 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9])
+            if header[5] & 0x10:
+                start += 10
+        if size >= 128:
+            f.seek(size - 128)
+            if f.read(3) == b'TAG':
+                end = size - 128
+    return start, max(end - start, 0)
+
+def partial_hash(path, start, length):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        h.update(f.read(min(length, PARTIAL_BYTES)))
+        if length > PARTIAL_BYTES * 2:
+            f.seek(start + length - PARTIAL_BYTES)
+            h.update(f.read(PARTIAL_BYTES))
+    return h.hexdigest()
+
+def full_hash(path, start, length):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+def refine(groups, key_func):
+    """各グループをさらに key_func で分け、2件以上残ったものだけ返す"""
+    refined = []
+    for group in groups:
+        buckets = defaultdict(list)
+        for item in group:
+            try:
+                buckets[key_func(item)].append(item)
+            except OSError as e:
+                print(f"⚠️ Error reading {item['path']}: {e}")
+        refined.extend(b for b in buckets.values() if len(b) > 1)
+    return refined
+
+def find_exact_duplicates(tracks):
+    # 1. 再生時間（秒）で候補を分ける（ファイルは開かない）
+    by_duration = defaultdict(list)
+    for track in tracks:
+        by_duration[round(track['duration_sec'] or 0)].append(track)
+    groups = [g for g in by_duration.values() if len(g) > 1]
+
+    # 2. タグを除いた音声部分のサイズで分ける（先頭10バイトと末尾128バイトだけ読む）
+    def payload_size(track):
+        if 'payload' not in track:
+            track['payload'] = audio_payload(track['path'], track['size'])
+        return track['payload'][1]
+    groups = refine(groups, payload_size)
+
+    # 3. 先頭・末尾の部分ハッシュ → 4. 残った候補だけ全体ハッシュ
+    groups = refine(groups, lambda t: partial_hash(t['path'], *t['payload']))
+    groups = refine(groups, lambda t: full_hash(t['path'], *t['payload']))
+    return groups
+
+def normalize(text):
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    # 「曲名 / 演奏者」の演奏者部分と記号・空白を無視する
+    text = text.split(' / ')[0]
+    return re.sub(r'[\W_]+', '', text)
+
+def find_near_duplicates(tracks, exact_paths):
+    buckets = defaultdict(list)
+    for track in tracks:
+        key = normalize(track['title'])
+        if key:
+            buckets[(key, normalize(track['artist']))].append(track)
+
+    groups = []
+    for group in buckets.values():
+        # 完全一致として報告済みのものだけのグループは除く
+        if len(group) > 1 and not all(t['path'] in exact_paths for t in group):
+            groups.append(group)
+    return groups
+
+def main():
+    parser = argparse.ArgumentParser(description="重複している曲を探す（先に extractor.py で索引を作っておく）")
+    parser.add_argument("--output", default=output_csv, help="結果のCSV")
+    args = parser.parse_args()
+
+    index = MusicIndex(index_db)
+    tracks = index.tracks()
+    index.close()
+
+    exact = find_exact_duplicates(tracks)
+    exact_paths = {t['path'] for group in exact for t in group}
+    near = find_near_duplicates(tracks, exact_paths)
+
+    with open(args.output, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['種別', 'グループ', '曲名', 'アーティスト', '再生時間(秒)', 'ファイルサイズ(バイト)', 'ファイルパス'])
+        for kind, groups in (('完全一致', exact), ('曲名・アーティスト一致', near)):
+            for number, group in enumerate(groups, 1):
+                for t in group:
+                    writer.writerow([kind, number, t['title'], t['artist'], round(t['duration_sec'] or 0), t['size'], t['path']])
+
+    print(f"🎯 完全一致 {len(exact)} グループ / 曲名・アーティスト一致 {len(near)} グループ（{len(tracks)} 曲中）")
+    print(f"✅ 結果を {args.output} に保存しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+
+# pyarrow は Parquet / Arrow 出力のときだけ必要
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+CSV_HEADER = [
+    '曲名', 'アーティスト', 'アルバム', '再生時間',
+    'ビットレート(kbps)', 'サンプリングレート(Hz)', 'ファイルサイズ(MB)',
+    '拡張子', 'ファイルパス'
+]
+
+# 型付き出力の列（再生時間は秒、ビットレートは bps、サイズはバイトのまま）
+TYPED_HEADER = ['title', 'artist', 'album', 'duration_sec', 'bitrate', 'sample_rate', 'size', 'ext', 'path']
+
+# Arrow / Parquet の一括書き込み単位（行数）
+BATCH_ROWS = 10000
+
+def format_duration(seconds):
+    minutes = int(seconds // 60)
+    seconds = int(seconds % 60)
+    return f"{minutes}:{seconds:02}"
+
+def to_csv_row(track):
+    # CSVは従来どおりの表示形式（再生時間は m:ss、ビットレートは kbps、サイズは MB）
+    bitrate = int(track['bitrate'] / 1000) if track['bitrate'] is not None else ''
+    sample_rate = track['sample_rate'] if track['sample_rate'] is not None else ''
+    size_mb = round(track['size'] / (1024 * 1024), 1)
+    return [
+        track['title'], track['artist'], track['album'], format_duration(track['duration_sec']),
+        bitrate, sample_rate, size_mb,
+        track['ext'], track['path']
+    ]
+
+def read_complete_text(path):
+    """途中で切れた最終行を切り捨て、完了している部分のテキストを返す"""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        if len(complete) != len(data):
+            f.truncate(len(complete))
+    return complete.decode('utf-8-sig')
+
+
+class CsvExporter:
+    """従来形式のCSV（walkman_music_full_info.csv）"""
+    extension = '.csv'
+    resumable = True
+
+    def __init__(self, path):
+        self.f = open(path, 'a', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.f)
+        if self.f.tell() == 0:
+            self.writer.writerow(self.header())
+
+    def header(self):
+        return CSV_HEADER
+
+    def row(self, track):
+        return to_csv_row(track)
+
+    @staticmethod
+    def done_paths(path):
+        rows = list(csv.reader(io.StringIO(read_complete_text(path))))
+        return {row[-1] for row in rows[1:] if row}
+
+    def write(self, track):
+        self.writer.writerow(self.row(track))
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class TypedCsvExporter(CsvExporter):
+    """生の値（秒・bps・Hz・バイト）のままのCSV"""
+    extension = '.typed.csv'
+
+    def header(self):
+        return TYPED_HEADER
+
+    def row(self, track):
+        return [track[key] if track[key] is not None else '' for key in TYPED_HEADER]
+
+
+class JsonlExporter:
+    """1行1曲の JSON Lines"""
+    extension = '.jsonl'
+    resumable = True
+
+    def __init__(self, path):
+        self.f = open(path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def done_paths(path):
+        lines = read_complete_text(path).splitlines()
+        return {json.loads(line)['path'] for line in lines if line}
+
+    def write(self, track):
+        self.f.write(json.dumps({key: track[key] for key in TYPED_HEADER}, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class ArrowExporter:
+    """型付き・圧縮済みの Arrow IPC ファイル（Feather v2）"""
+    extension = '.arrow'
+    resumable = False
+
+    def __init__(self, path):
+        if pa is None:
+            raise RuntimeError("Parquet / Arrow 出力には pyarrow が必要です（pip install pyarrow）")
+        self.schema = pa.schema([
+            ('title', pa.string()),
+            ('artist', pa.string()),
+            ('album', pa.string()),
+            ('duration_sec', pa.float64()),
+            ('bitrate', pa.int32()),
+            ('sample_rate', pa.int32()),
+            ('size', pa.int64()),
+            ('ext', pa.dictionary(pa.int8(), pa.string())),
+            ('path', pa.string()),
+        ])
+        self.rows = []
+        self.writer = self.open_writer(path)
+
+    def open_writer(self, path):
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        return pa.ipc.new_file(path, self.schema, options=options)
+
+    def write(self, track):
+        self.rows.append(track)
+        if len(self.rows) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            batch = pa.RecordBatch.from_pylist(
+                [{key: track[key] for key in TYPED_HEADER} for track in self.rows],
+                schema=self.schema
+            )
+            self.writer.write_batch(batch)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class ParquetExporter(ArrowExporter):
+    """型付き・圧縮済みの Parquet ファイル"""
+    extension = '.parquet'
+
+    def open_writer(self, path):
+        return pq.ParquetWriter(path, self.schema, compression='zstd')
+
+
+EXPORTERS = {
+    'csv': CsvExporter,
+    'typed-csv': TypedCsvExporter,
+    'jsonl': JsonlExporter,
+    'arrow': ArrowExporter,
+    'parquet': ParquetExporter,
+}
@@ -1,62 +1,229 @@
 from mutagen import File
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import argparse
+import io
 import os
-import csv
+import time
+
+from exporters import EXPORTERS
+from music_index import MusicIndex
+from scanner import Census, iter_files
 
 music_folder = r"E:\MUSIC"
 output_csv = "walkman_music_full_info.csv"
+index_db = "walkman_music_index.sqlite3"
+unsupported_report = "walkman_unsupported_files.txt"
 supported_exts = ['.mp3', '.flac', '.wav', '.m4a']
 
-music_data = []
+# 出力を flush する間隔（行数）
+FLUSH_EVERY = 500
 
-def format_duration(seconds):
-    minutes = int(seconds // 60)
-    seconds = int(seconds % 60)
-    return f"{minutes}:{seconds:02}"
+# --header-only 時に先頭から読み込むバイト数（ID3v2 タグ分は別途加算）
+HEADER_BYTES = 64 * 1024
 
-for root, dirs, files in os.walk(music_folder):
-    for file in files:
-        ext = os.path.splitext(file)[1].lower()
-        if ext in supported_exts:
-            path = os.path.join(root, file)
-            try:
-                audio = File(path, easy=True)
-                info = File(path)
-                
-                # メタデータ
-                title = audio.get('title', [''])[0]
-                artist = audio.get('artist', [''])[0]
-                album = audio.get('album', [''])[0]
+class HeaderPrefetch(io.RawIOBase):
+    """先頭のヘッダー領域を1回の読み込みでメモリに載せ、mutagen の細かい読み取りをそこから返す"""
+
+    def __init__(self, f, path):
+        self.f = f
+        self.name = path
+        self.size = os.fstat(f.fileno()).st_size
+        self.pos = 0
+
+        # ID3v2 タグがあればタグ全体＋先頭フレーム分を読み込む
+        head = f.read(10)
+        head_size = HEADER_BYTES
+        if head[:3] == b'ID3' and len(head) == 10:
+            tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+            head_size += 10 + tag_size
+        self.head = head + f.read(head_size - len(head))
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
 
-                # 再生時間
-                duration_sec = info.info.length if info and info.info else 0
-                duration = format_duration(duration_sec)
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.pos = offset
+        elif whence == io.SEEK_CUR:
+            self.pos += offset
+        else:
+            self.pos = self.size + offset
+        return self.pos
 
-                # ビットレート（kbps）
-                bitrate = int(info.info.bitrate / 1000) if hasattr(info.info, 'bitrate') else ''
+    def readinto(self, buffer):
+        end = min(self.pos + len(buffer), self.size)
+        if end <= self.pos:
+            return 0
+        if end <= len(self.head):
+            data = self.head[self.pos:end]
+        else:
+            # ヘッダー領域の外（末尾の ID3v1 など）だけ実ファイルから読む
+            self.f.seek(self.pos)
+            data = self.f.read(end - self.pos)
+        buffer[:len(data)] = data
+        self.pos += len(data)
+        return len(data)
 
-                # サンプリングレート（Hz）
-                sample_rate = int(info.info.sample_rate) if hasattr(info.info, 'sample_rate') else ''
+def read_track(path, ext, header_only=False):
+    # 1回だけ開いて、タグ・ストリーム情報・サイズを同じ解析結果から取る
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        audio = File(HeaderPrefetch(f, path) if header_only else f, easy=True)
 
-                # ファイルサイズ（MB）
-                size_mb = round(os.path.getsize(path) / (1024 * 1024), 1)
+    # メタデータ
+    title = audio.get('title', [''])[0]
+    artist = audio.get('artist', [''])[0]
+    album = audio.get('album', [''])[0]
+
+    # 再生時間（秒）
+    duration_sec = audio.info.length if audio and audio.info else 0
+
+    # ビットレート（bps）
+    bitrate = int(audio.info.bitrate) if hasattr(audio.info, 'bitrate') else None
+
+    # サンプリングレート（Hz）
+    sample_rate = int(audio.info.sample_rate) if hasattr(audio.info, 'sample_rate') else None
+
+    return {
+        'title': title, 'artist': artist, 'album': album,
+        'duration_sec': duration_sec, 'bitrate': bitrate, 'sample_rate': sample_rate,
+        'size': size, 'ext': ext, 'path': path
+    }
+
+def extract_tracks(files, index, workers=1, use_processes=False, header_only=False):
+    """
+    (path, st, track, parsed) を files と同じ順序で返す。
+    workers > 1 のときは新規・変更ありのファイルだけをワーカーに渡し、
+    先読みの件数を workers * 4 に抑えて結果を順番どおりに回収する。
+    """
+    if workers <= 1:
+        for path, ext, st in files:
+            track = index.lookup(path, st)
+            if track is not None:
+                yield path, st, track, False
+                continue
+            try:
+                yield path, st, read_track(path, ext, header_only), True
+            except Exception as e:
+                print(f"⚠️ Error reading {os.path.basename(path)}: {e}")
+        return
 
-                music_data.append([
-                    title, artist, album, duration,
-                    bitrate, sample_rate, size_mb,
-                    ext, path
-                ])
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        pending = deque()
 
+        def collect():
+            path, st, track, future = pending.popleft()
+            if future is None:
+                return path, st, track, False
+            try:
+                return path, st, future.result(), True
             except Exception as e:
-                print(f"⚠️ Error reading {file}: {e}")
-
-# CSV出力
-with open(output_csv, 'w', newline='', encoding='utf-8-sig') as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        '曲名', 'アーティスト', 'アルバム', '再生時間',
-        'ビットレート(kbps)', 'サンプリングレート(Hz)', 'ファイルサイズ(MB)',
-        '拡張子', 'ファイルパス'
-    ])
-    writer.writerows(music_data)
-
-print(f"✅ {len(music_data)} 件の曲情報を {output_csv} に保存しました。")
+                print(f"⚠️ Error reading {os.path.basename(path)}: {e}")
+                return None
+
+        for path, ext, st in files:
+            track = index.lookup(path, st)
+            future = None if track is not None else pool.submit(read_track, path, ext, header_only)
+            pending.append((path, st, track, future))
+            while len(pending) >= workers * 4:
+                result = collect()
+                if result:
+                    yield result
+
+        while pending:
+            result = collect()
+            if result:
+                yield result
+
+def main():
+    parser = argparse.ArgumentParser(description="Walkman の曲情報をCSVなどに書き出す")
+    parser.add_argument("--header-only", action="store_true",
+                        help="ヘッダー領域だけを先読みして解析する（USB接続の端末やSDカード向け）")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="並列に解析するワーカー数（既定: 1 = 逐次）")
+    parser.add_argument("--processes", action="store_true",
+                        help="スレッドではなくプロセスで並列化する")
+    parser.add_argument("--format", choices=sorted(EXPORTERS), default="csv",
+                        help="出力形式（csv は従来形式、typed-csv / jsonl / parquet / arrow は生の数値）")
+    parser.add_argument("--output", help="出力ファイル（省略時は形式に応じて自動で決める）")
+    parser.add_argument("--census", action="store_true",
+                        help="同じ走査で拡張子ごとの件数・容量と対象外ファイルを集計する")
+    args = parser.parse_args()
+
+    exporter_class = EXPORTERS[args.format]
+    output = args.output or (
+        output_csv if args.format == "csv"
+        else os.path.splitext(output_csv)[0] + exporter_class.extension
+    )
+
+    started = time.perf_counter()
+    index = MusicIndex(index_db)
+    partial = output + ".partial"
+    seen_paths = set()
+    parsed = 0
+    written = 0
+
+    # 中断された出力があれば、書き込み済みのパスは飛ばして続きから追記する
+    # （Parquet / Arrow は追記できないので最初から書き直す）
+    done_paths = set()
+    if os.path.exists(partial):
+        if exporter_class.resumable and os.path.getsize(partial) > 0:
+            done_paths = exporter_class.done_paths(partial)
+            seen_paths |= done_paths
+            written = len(done_paths)
+            print(f"↩️ 前回の途中経過（{written} 件）から再開します。")
+        else:
+            os.remove(partial)
+
+    census = Census(supported_exts) if args.census else None
+    exporter = exporter_class(partial)
+    try:
+        files = (
+            item for item in iter_files(music_folder, supported_exts, census)
+            if item[0] not in done_paths
+        )
+        for path, st, track, was_parsed in extract_tracks(
+            files, index, args.workers, args.processes, args.header_only
+        ):
+            seen_paths.add(path)
+            # 新規・変更ありのファイルだけ索引を更新する
+            if was_parsed:
+                index.store(path, st, track)
+                parsed += 1
+
+            # 1行ずつ書き出し、一定件数ごとにディスクと索引へ確定させる
+            exporter.write(track)
+            written += 1
+            if written % FLUSH_EVERY == 0:
+                exporter.flush()
+                index.commit()
+    finally:
+        exporter.close()
+
+    # 削除された曲を索引から除外
+    removed = index.prune(seen_paths)
+    index.close()
+
+    # 最後まで書けたら本来の出力ファイルに置き換える
+    os.replace(partial, output)
+
+    if census is not None:
+        print(census.report())
+        with open(unsupported_report, 'w', encoding='utf-8') as f:
+            f.writelines(path + '\n' for path in census.unsupported)
+        print(f"📝 対象外ファイル {len(census.unsupported)} 件を {unsupported_report} に書き出しました。")
+
+    elapsed = time.perf_counter() - started
+    print(f"🔍 解析 {parsed} 件 / キャッシュ利用 {written - parsed} 件 / 削除 {len(removed)} 件（{elapsed:.2f} 秒）")
+    print(f"✅ {written} 件の曲情報を {output} に保存しました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import sqlite3
+
+# 曲情報のキャッシュ（パスごとに mtime / サイズを記録し、変更がなければ再解析しない）
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    title TEXT,
+    artist TEXT,
+    album TEXT,
+    duration_sec REAL,
+    bitrate INTEGER,
+    sample_rate INTEGER,
+    ext TEXT
+)
+"""
+
+TRACK_FIELDS = ['title', 'artist', 'album', 'duration_sec', 'bitrate', 'sample_rate', 'size', 'ext', 'path']
+
+
+def signature(st):
+    # ファイルが変わったかどうかの判定に使う値
+    # inode は比べない。Windows の DirEntry.stat() では st_ino が常に 0 になり、
+    # os.stat で記録した行と一致しなくなる（inode 列は既存の索引との互換のために残している）
+    return (st.st_mtime_ns, st.st_size)
+
+
+class MusicIndex:
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(SCHEMA)
+        # 起動時に全件の署名を一度だけ読み込む（1件ずつSELECTしない）
+        self.signatures = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.conn.execute(
+                "SELECT path, mtime_ns, size FROM tracks"
+            )
+        }
+
+    def lookup(self, path, st):
+        """変更がなければキャッシュ済みの曲情報を返す。新規・変更ありなら None"""
+        if self.signatures.get(path) != signature(st):
+            return None
+        row = self.conn.execute(
+            "SELECT title, artist, album, duration_sec, bitrate, sample_rate, size, ext, path"
+            " FROM tracks WHERE path = ?",
+            (path,)
+        ).fetchone()
+        return dict(zip(TRACK_FIELDS, row)) if row else None
+
+    def tracks(self):
+        """索引に入っている全曲（パス順）"""
+        return [
+            dict(zip(TRACK_FIELDS, row)) for row in self.conn.execute(
+                "SELECT title, artist, album, duration_sec, bitrate, sample_rate, size, ext, path"
+                " FROM tracks ORDER BY path"
+            )
+        ]
+
+    def store(self, path, st, track):
+        mtime_ns, size = signature(st)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO tracks"
+            " (path, mtime_ns, size, inode, title, artist, album, duration_sec, bitrate, sample_rate, ext)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, mtime_ns, size, st.st_ino,
+             track['title'], track['artist'], track['album'], track['duration_sec'],
+             track['bitrate'], track['sample_rate'], track['ext'])
+        )
+        self.signatures[path] = (mtime_ns, size)
+
+    def prune(self, seen_paths):
+        """今回のスキャンで見つからなかった（削除された）曲を索引から消す"""
+        removed = [path for path in self.signatures if path not in seen_paths]
+        self.conn.executemany("DELETE FROM tracks WHERE path = ?", [(p,) for p in removed])
+        for path in removed:
+            del self.signatures[path]
+        return removed
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,76 @@
+import os
+from collections import Counter
+
+# ライブラリ走査の共通部品
+# os.scandir の DirEntry.stat() を使い回し、1回の走査で曲情報の抽出と拡張子の集計を済ませる
+
+
+def scan(folder):
+    """os.walk と同じ順序（ディレクトリ内のファイル → サブディレクトリ）で全ファイルの DirEntry を返す"""
+    try:
+        with os.scandir(folder) as it:
+            entries = list(it)
+    except OSError as e:
+        print(f"⚠️ Error reading {folder}: {e}")
+        return
+
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        else:
+            yield entry
+
+    for subdir in subdirs:
+        yield from scan(subdir)
+
+
+def extension(name):
+    return os.path.splitext(name)[1].lower()
+
+
+class Census:
+    """拡張子ごとのファイル数・合計バイト数と、対象外ファイルの一覧"""
+
+    def __init__(self, supported_exts):
+        self.supported_exts = set(supported_exts)
+        self.counts = Counter()
+        self.bytes = Counter()
+        self.unsupported = []
+
+    def add(self, path, ext, size):
+        self.counts[ext] += 1
+        self.bytes[ext] += size
+        if ext not in self.supported_exts:
+            self.unsupported.append(path)
+
+    def unsupported_exts(self):
+        return sorted(ext for ext in self.counts if ext not in self.supported_exts)
+
+    def report(self):
+        lines = ["📊 拡張子ごとの集計："]
+        for ext, count in self.counts.most_common():
+            mark = "" if ext in self.supported_exts else "（対象外）"
+            lines.append(f" - {ext or '(拡張子なし)'}: {count} 件 / {self.bytes[ext] / (1024 * 1024):.1f} MB{mark}")
+        return "\n".join(lines)
+
+
+def iter_files(folder, exts=None, census=None):
+    """
+    (path, ext, st) を返すジェネレーター。
+    exts を指定するとその拡張子だけを返し、census を渡すと対象外も含めた全ファイルを集計する。
+    """
+    for entry in scan(folder):
+        ext = extension(entry.name)
+        wanted = exts is None or ext in exts
+        if not wanted and census is None:
+            continue
+        try:
+            st = entry.stat()
+        except OSError as e:
+            print(f"⚠️ Error reading {entry.name}: {e}")
+            continue
+        if census is not None:
+            census.add(entry.path, ext, st.st_size)
+        if wanted:
+            yield entry.path, ext, st